@@ -0,0 +1,178 @@
+# app/core/admission.py
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+
+class AdmissionTimeout(Exception):
+    """No slot became free before the caller's deadline."""
+
+
+class _Waiter:
+    def __init__(self, priority: int):
+        self.priority = priority
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+    def notify(self):
+        self.event.set()
+
+
+class _AsyncWaiter:
+    """Waiter for coroutines; woken thread-safely on its event loop."""
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+        self.granted = False
+        self.cancelled = False
+
+    def _wake(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+    def notify(self):
+        self.loop.call_soon_threadsafe(self._wake)
+
+
+class AdmissionController:
+    """
+    Priority-aware admission control for expensive work (used for LLM calls).
+
+    At most `max_concurrency` calls run at once. Callers beyond that wait in a
+    priority queue (interactive before background, FIFO within a priority)
+    until a slot frees up or their deadline passes. Threads (`acquire`) and
+    coroutines (`acquire_async`) share the same slots and queue; coroutines
+    wait on a future, so queued requests hold no threads.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._available = max_concurrency
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._queued = {}  # priority -> waiting callers (excluding cancelled)
+
+        self._admitted = 0
+        self._timed_out = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _record_admit(self, waited: float):
+        self._admitted += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    def _enqueue(self, waiter) -> bool:
+        """Take a free slot immediately, or queue `waiter`. Caller holds the lock."""
+        if self._available > 0 and not any(self._queued.values()):
+            self._available -= 1
+            self._record_admit(0.0)
+            return True
+        heapq.heappush(self._heap, (waiter.priority, next(self._seq), waiter))
+        self._queued[waiter.priority] = self._queued.get(waiter.priority, 0) + 1
+        return False
+
+    def _finish_wait(self, waiter, started: float) -> bool:
+        """Settle a waiter after it woke or timed out. Caller holds the lock."""
+        if waiter.granted:
+            self._record_admit(time.monotonic() - started)
+            return True
+        waiter.cancelled = True  # removed lazily when it reaches the top of the heap
+        self._queued[waiter.priority] -= 1
+        self._timed_out += 1
+        return False
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None):
+        """Block until a slot is granted; raise AdmissionTimeout after `timeout` seconds."""
+        started = time.monotonic()
+        waiter = _Waiter(priority)
+        with self._lock:
+            if self._enqueue(waiter):
+                return
+        waiter.event.wait(timeout)
+        with self._lock:
+            if self._finish_wait(waiter, started):
+                return
+        raise AdmissionTimeout(f"no capacity within {timeout:.1f}s")
+
+    async def acquire_async(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None):
+        """Await a slot without blocking the event loop; raise AdmissionTimeout after `timeout` seconds."""
+        started = time.monotonic()
+        waiter = _AsyncWaiter(priority)
+        with self._lock:
+            if self._enqueue(waiter):
+                return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # Caller was cancelled (e.g. client disconnected): give back a slot we may have been handed
+            with self._lock:
+                granted = self._finish_wait(waiter, started)
+            if granted:
+                self.release()
+            raise
+        with self._lock:
+            if self._finish_wait(waiter, started):
+                return
+        raise AdmissionTimeout(f"no capacity within {timeout:.1f}s")
+
+    def release(self):
+        """Hand the slot to the highest-priority waiter, or return it to the pool."""
+        with self._lock:
+            while self._heap:
+                _, _, waiter = heapq.heappop(self._heap)
+                if waiter.cancelled:
+                    continue
+                waiter.granted = True
+                self._queued[waiter.priority] -= 1
+                waiter.notify()
+                return
+            self._available += 1
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None):
+        self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def slot_async(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None):
+        await self.acquire_async(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.max_concurrency - self._available,
+                "queue_depth": sum(self._queued.values()),
+                "queue_depth_by_priority": {
+                    _PRIORITY_NAMES.get(p, str(p)): n for p, n in self._queued.items()
+                },
+                "admitted": self._admitted,
+                "timed_out": self._timed_out,
+                "avg_wait_ms": round(self._total_wait / self._admitted * 1000, 2) if self._admitted else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 2),
+            }
+
@@ -0,0 +1,56 @@
+# app/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with an optional per-entry TTL.
+
+    Holds at most `max_entries` items; the least recently used entry is
+    evicted first, and expired entries are dropped when they are read.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
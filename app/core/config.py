@@ -39,9 +39,120 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0" 
     
     GROQ_API_KEY: Optional[str] = None
+
+    # --- SHARED LLM CLIENT ---
+    LLM_TIMEOUT_SECONDS: float = 15.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BASE_SECONDS: float = 0.5
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MODEL_CACHE_TTL_SECONDS: int = 3600
+    # Circuit breaker: open after this many consecutive failures, probe again after the cooldown
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: int = 30
+    # Admission control: concurrent LLM calls across the process, and per-request deadlines
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_INTERACTIVE_DEADLINE_SECONDS: float = 8.0
+    LLM_BACKGROUND_DEADLINE_SECONDS: float = 120.0
     APP_ENV: str = "development"
+    # Comma-separated emails allowed to call /admin endpoints
+    ADMIN_EMAILS: str = ""
     SMTP_EMAIL: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
 
+    # --- SMTP DISPATCH ---
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 587
+    SMTP_USE_TLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+    # Authenticated sessions kept open and reused by the reminder dispatcher
+    SMTP_POOL_SIZE: int = 4
+    # Recycle a session after this many messages (Gmail drops long-lived sessions)
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+
+    # --- NOTIFICATION OUTBOX ---
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_RETRY_BASE_SECONDS: int = 60
+    OUTBOX_DRAIN_INTERVAL_SECONDS: int = 60
+
+    # --- BACKGROUND CATEGORIZATION ---
+    CATEGORIZATION_WORKERS: int = 2
+    CATEGORIZATION_SWEEP_INTERVAL_SECONDS: int = 300
+    CATEGORIZATION_SWEEP_BATCH_SIZE: int = 50
+    # Bulk re-categorization: distinct names read per chunk / names sent per LLM prompt
+    RECATEGORIZE_CHUNK_SIZE: int = 500
+    RECATEGORIZE_PROMPT_BATCH_SIZE: int = 40
+
+    # --- CATEGORY CACHE (in-process LRU -> service_catalog table -> LLM) ---
+    CATEGORY_CACHE_MAX_ENTRIES: int = 10000
+    CATEGORY_CACHE_TTL_SECONDS: int = 86400
+    CATEGORY_CATALOG_TTL_DAYS: int = 90
+
+    # --- AI RESPONSE CACHE (keyed on users.data_version) ---
+    # "memory" (per-worker LRU), "redis" (shared, uses REDIS_URL) or "none"
+    AI_CACHE_BACKEND: str = "memory"
+    AI_CACHE_MAX_ENTRIES: int = 5000
+    AI_CACHE_TTL_SECONDS: int = 86400
+    AI_CACHE_REDIS_TIMEOUT_SECONDS: float = 0.5
+
+    # --- MONTHLY REPORT PRECOMPUTATION (off-peak batch job) ---
+    REPORT_PRECOMPUTE_HOUR: int = 2  # UTC
+    REPORT_PRECOMPUTE_BATCH_SIZE: int = 200
+    # Reports generated in parallel; each still takes a background admission slot
+    REPORT_PRECOMPUTE_CONCURRENCY: int = 4
+
+    # --- SPEND LEDGER ---
+    LEDGER_POST_BATCH_SIZE: int = 1000
+    ANALYTICS_MAX_MONTHS: int = 120
+
+    # --- FORECASTING ---
+    FORECAST_MAX_MONTHS: int = 36
+    # Subscriptions expanded per NumPy block in cohort forecasts (bounds memory)
+    FORECAST_COHORT_CHUNK_SIZE: int = 50000
+
+    # --- BUDGET OPTIMIZER ---
+    # Savings are solved in cents up to this many steps, coarser beyond (bounds solve time and memory)
+    OPTIMIZER_MAX_STEPS: int = 20000
+    OPTIMIZER_MAX_SUBSCRIPTIONS: int = 2000
+    OPTIMIZER_WORKERS: int = 2
+
+    # --- BULK IMPORT ---
+    # Rows validated, categorized and inserted per statement/transaction step
+    IMPORT_BATCH_SIZE: int = 500
+    IMPORT_MAX_REPORTED_ERRORS: int = 100
+    IMPORT_MAX_LINE_LENGTH: int = 65536
+
+    # --- PAGINATION ---
+    SUBSCRIPTIONS_PAGE_DEFAULT: int = 100
+    SUBSCRIPTIONS_PAGE_MAX: int = 500
+
+    # --- DELTA SYNC ---
+    SYNC_PAGE_SIZE: int = 500
+    # Deletes are remembered this long; older cursors get a full resync
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # --- SEARCH ---
+    # auto: pg_trgm indexes on PostgreSQL when available, else the in-process n-gram index
+    SEARCH_BACKEND: str = "auto"  # auto | ngram
+    SEARCH_SIMILARITY_THRESHOLD: float = 0.5
+    SEARCH_MAX_RESULTS: int = 50
+    # Per-user n-gram indexes kept in memory (keyed by data_version, so never stale)
+    SEARCH_INDEX_CACHE_USERS: int = 256
+
+    # --- AUTOCOMPLETE ---
+    SUGGEST_MAX_RESULTS: int = 10
+    # Most common subscription names indexed next to the known-service keywords
+    SUGGEST_INDEX_MAX_NAMES: int = 5000
+    # A name is only suggested once this many accounts use it, so private names never leak
+    SUGGEST_MIN_OWNERS: int = 3
+    # Full rebuild picks up new popular names, renames and deletes
+    SUGGEST_REFRESH_MINUTES: int = 30
+
+    # --- EXPORT ---
+    # Rows fetched per server-side cursor round trip, and bytes encoded per response chunk
+    EXPORT_FETCH_ROWS: int = 1000
+    EXPORT_CHUNK_BYTES: int = 65536
+
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,435 @@
+# app/core/llm_client.py
+import asyncio
+import random
+import threading
+import time
+from typing import AsyncIterator, Optional
+import httpx
+import groq
+from groq import AsyncGroq, Groq
+from app.core.admission import AdmissionController, AdmissionTimeout, PRIORITY_INTERACTIVE
+from app.core.config import settings
+
+# ✅ Preferred models (top one tried first)
+PREFERRED_MODELS = [
+    "llama-3.3-70b-versatile",
+    "llama-3.1-8b-instant",
+    "gemma2-9b-it",
+]
+
+# Errors worth retrying: the request may succeed on another attempt
+_RETRYABLE_ERRORS = (
+    groq.APITimeoutError,
+    groq.APIConnectionError,
+    groq.RateLimitError,
+    groq.InternalServerError,
+)
+
+
+class LLMUnavailable(Exception):
+    """The LLM could not be reached (breaker open, timeouts or repeated errors)."""
+
+
+class LLMDeadlineExceeded(LLMUnavailable):
+    """The request's deadline passed while queued for, or waiting on, the LLM."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    -> calls pass; `failure_threshold` failures in a row open it.
+    open      -> calls fail fast until `reset_seconds` have passed.
+    half_open -> one probe call is let through; success closes, failure reopens.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"⚡ LLM circuit breaker opened after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures}
+
+
+breaker = CircuitBreaker(settings.LLM_BREAKER_FAILURE_THRESHOLD, settings.LLM_BREAKER_RESET_SECONDS)
+admission = AdmissionController(settings.LLM_MAX_CONCURRENCY)
+
+_client: Optional[Groq] = None
+_async_client: Optional[AsyncGroq] = None
+_client_lock = threading.Lock()
+
+_model_cache = {"model": None, "expires_at": 0.0}
+_model_lock = threading.Lock()
+
+
+def _timeout(seconds: Optional[float] = None) -> httpx.Timeout:
+    return httpx.Timeout(seconds or settings.LLM_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+    )
+
+
+def get_client() -> Groq:
+    """Shared Groq client over one pooled, keep-alive HTTP connection pool."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = Groq(
+                    api_key=settings.GROQ_API_KEY,
+                    http_client=httpx.Client(timeout=_timeout(), limits=_limits()),
+                    max_retries=0,  # retries are handled here, with jitter and the breaker
+                )
+    return _client
+
+
+def get_async_client() -> AsyncGroq:
+    """Shared async Groq client for the event loop, with its own connection pool."""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncGroq(
+                    api_key=settings.GROQ_API_KEY,
+                    http_client=httpx.AsyncClient(timeout=_timeout(), limits=_limits()),
+                    max_retries=0,
+                )
+    return _async_client
+
+
+async def aclose_clients():
+    """Close the shared HTTP connection pools (called on shutdown)."""
+    global _client, _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def _cached_model() -> Optional[str]:
+    if _model_cache["model"] and _model_cache["expires_at"] > time.monotonic():
+        return _model_cache["model"]
+    return None
+
+
+def pick_model() -> str:
+    """Pick the first preferred model available to the account, cached for LLM_MODEL_CACHE_TTL_SECONDS."""
+    now = time.monotonic()
+    if _cached_model():
+        return _model_cache["model"]
+
+    with _model_lock:
+        if _model_cache["model"] and _model_cache["expires_at"] > now:
+            return _model_cache["model"]
+
+        model = PREFERRED_MODELS[0]
+        ttl = settings.LLM_MODEL_CACHE_TTL_SECONDS
+        try:
+            available = {m.id for m in get_client().models.list(timeout=_timeout()).data}
+            model = next((m for m in PREFERRED_MODELS if m in available), model)
+            print(f"✅ Using Groq model: {model}")
+        except Exception as e:
+            # Don't hammer the models endpoint while it is failing, but retry sooner
+            ttl = min(ttl, 60)
+            print(f"⚠️ Could not fetch models list: {e}. Defaulting to {model}")
+
+        _model_cache.update(model=model, expires_at=now + ttl)
+        return model
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, settings.LLM_RETRY_BASE_SECONDS * (2 ** attempt))
+
+
+def chat_completion(
+    messages: list[dict],
+    *,
+    model: Optional[str] = None,
+    max_tokens: int = 256,
+    temperature: float = 0.7,
+    timeout: Optional[float] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline: Optional[float] = None,
+    **kwargs,
+) -> str:
+    """
+    Run a chat completion through the shared client and return the message text.
+
+    The call first waits for an admission slot (by `priority`), then applies a
+    per-call timeout, retries transient errors with jittered backoff and
+    records the outcome on the circuit breaker. `deadline` is the total time
+    budget in seconds, covering queueing and every attempt.
+
+    Raises LLMDeadlineExceeded when the deadline passes, and LLMUnavailable
+    when the breaker is open or every attempt failed, so callers can fall back.
+    """
+    started = time.monotonic()
+
+    def remaining() -> Optional[float]:
+        return None if deadline is None else deadline - (time.monotonic() - started)
+
+    try:
+        admission.acquire(priority, timeout=deadline)
+    except AdmissionTimeout as e:
+        raise LLMDeadlineExceeded(str(e)) from e
+
+    try:
+        budget = remaining()
+        if budget is not None and budget <= 0:
+            raise LLMDeadlineExceeded(f"deadline of {deadline:.1f}s exceeded while queued")
+        if not breaker.allow():
+            raise LLMUnavailable("LLM circuit breaker is open")
+
+        client = get_client()
+        model = model or pick_model()
+        last_error: Optional[Exception] = None
+
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(_backoff(attempt))
+            budget = remaining()
+            if budget is not None and budget <= 0:
+                # Only reachable after slow or failed attempts, so it counts against the provider
+                breaker.record_failure()
+                raise LLMDeadlineExceeded(f"deadline of {deadline:.1f}s exceeded")
+            call_timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+            if budget is not None:
+                call_timeout = min(call_timeout, budget)
+            try:
+                resp = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=_timeout(call_timeout),
+                    **kwargs,
+                )
+                breaker.record_success()
+                return (resp.choices[0].message.content or "").strip()
+            except _RETRYABLE_ERRORS as e:
+                last_error = e
+                print(f"⚠️ LLM call failed (attempt {attempt + 1}): {e}")
+            except groq.APIStatusError as e:
+                # Bad request, auth, etc.: the provider is up, so don't trip the breaker,
+                # but retrying won't help either
+                breaker.record_success()
+                raise LLMUnavailable(str(e)) from e
+            except Exception as e:
+                breaker.record_failure()
+                raise LLMUnavailable(str(e)) from e
+
+        breaker.record_failure()
+        raise LLMUnavailable(str(last_error))
+    finally:
+        admission.release()
+
+
+async def achat_completion(
+    messages: list[dict],
+    *,
+    model: Optional[str] = None,
+    max_tokens: int = 256,
+    temperature: float = 0.7,
+    timeout: Optional[float] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline: Optional[float] = None,
+    **kwargs,
+) -> str:
+    """
+    Async counterpart of chat_completion for the event loop.
+
+    Shares the admission queue and circuit breaker with the sync path, but
+    waits on futures and the async HTTP client, so in-flight requests hold
+    no threads.
+    """
+    started = time.monotonic()
+
+    def remaining() -> Optional[float]:
+        return None if deadline is None else deadline - (time.monotonic() - started)
+
+    try:
+        await admission.acquire_async(priority, timeout=deadline)
+    except AdmissionTimeout as e:
+        raise LLMDeadlineExceeded(str(e)) from e
+
+    try:
+        budget = remaining()
+        if budget is not None and budget <= 0:
+            raise LLMDeadlineExceeded(f"deadline of {deadline:.1f}s exceeded while queued")
+        if not breaker.allow():
+            raise LLMUnavailable("LLM circuit breaker is open")
+
+        client = get_async_client()
+        # The models list is only fetched when the cached choice expires
+        model = model or _cached_model() or await asyncio.to_thread(pick_model)
+        last_error: Optional[Exception] = None
+
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(_backoff(attempt))
+            budget = remaining()
+            if budget is not None and budget <= 0:
+                breaker.record_failure()
+                raise LLMDeadlineExceeded(f"deadline of {deadline:.1f}s exceeded")
+            call_timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+            if budget is not None:
+                call_timeout = min(call_timeout, budget)
+            try:
+                resp = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=_timeout(call_timeout),
+                    **kwargs,
+                )
+                breaker.record_success()
+                return (resp.choices[0].message.content or "").strip()
+            except _RETRYABLE_ERRORS as e:
+                last_error = e
+                print(f"⚠️ LLM call failed (attempt {attempt + 1}): {e}")
+            except groq.APIStatusError as e:
+                breaker.record_success()
+                raise LLMUnavailable(str(e)) from e
+            except Exception as e:
+                breaker.record_failure()
+                raise LLMUnavailable(str(e)) from e
+
+        breaker.record_failure()
+        raise LLMUnavailable(str(last_error))
+    finally:
+        admission.release()
+
+
+async def astream_chat_completion(
+    messages: list[dict],
+    *,
+    model: Optional[str] = None,
+    max_tokens: int = 256,
+    temperature: float = 0.7,
+    timeout: Optional[float] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline: Optional[float] = None,
+    **kwargs,
+) -> AsyncIterator[str]:
+    """
+    Stream a chat completion through the shared async client, yielding text
+    deltas as they arrive.
+
+    Admission, breaker and retries work as in achat_completion, but only up
+    to the point the stream opens: `deadline` bounds the time to the first
+    response, and after that `timeout` bounds each read. Once tokens have
+    been sent a failure cannot be retried, so it raises LLMUnavailable.
+    """
+    started = time.monotonic()
+
+    def remaining() -> Optional[float]:
+        return None if deadline is None else deadline - (time.monotonic() - started)
+
+    try:
+        await admission.acquire_async(priority, timeout=deadline)
+    except AdmissionTimeout as e:
+        raise LLMDeadlineExceeded(str(e)) from e
+
+    try:
+        budget = remaining()
+        if budget is not None and budget <= 0:
+            raise LLMDeadlineExceeded(f"deadline of {deadline:.1f}s exceeded while queued")
+        if not breaker.allow():
+            raise LLMUnavailable("LLM circuit breaker is open")
+
+        client = get_async_client()
+        model = model or _cached_model() or await asyncio.to_thread(pick_model)
+        read_timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+        stream = None
+        last_error: Optional[Exception] = None
+
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(_backoff(attempt))
+            budget = remaining()
+            if budget is not None and budget <= 0:
+                breaker.record_failure()
+                raise LLMDeadlineExceeded(f"deadline of {deadline:.1f}s exceeded")
+            call_timeout = read_timeout if budget is None else min(read_timeout, budget)
+            try:
+                stream = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    timeout=_timeout(call_timeout),
+                    **kwargs,
+                )
+                break
+            except _RETRYABLE_ERRORS as e:
+                last_error = e
+                print(f"⚠️ LLM stream failed to open (attempt {attempt + 1}): {e}")
+            except groq.APIStatusError as e:
+                breaker.record_success()
+                raise LLMUnavailable(str(e)) from e
+            except Exception as e:
+                breaker.record_failure()
+                raise LLMUnavailable(str(e)) from e
+
+        if stream is None:
+            breaker.record_failure()
+            raise LLMUnavailable(str(last_error))
+
+        # The provider answered; record it now so a client disconnecting
+        # mid-stream can't leave a half-open probe unresolved
+        breaker.record_success()
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except (groq.APIError, httpx.HTTPError) as e:
+            breaker.record_failure()
+            raise LLMUnavailable(f"stream interrupted: {e}") from e
+        finally:
+            await stream.close()
+    finally:
+        admission.release()
@@ -0,0 +1,22 @@
+# app/core/pagination.py
+import base64
+import json
+from fastapi import HTTPException, status
+
+
+def encode_cursor(position: dict) -> str:
+    """Opaque, URL-safe cursor for a keyset position."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Inverse of encode_cursor; a cursor that does not decode is a 400."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        position = None
+    if not isinstance(position, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+    return position
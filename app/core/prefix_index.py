@@ -0,0 +1,99 @@
+# app/core/prefix_index.py
+import threading
+from typing import Iterable, Optional
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace, so "Netflix  Premium" and "netflix premium" share a key."""
+    return " ".join(text.lower().split())
+
+
+class _Term:
+    __slots__ = ("key", "label", "category", "weight")
+
+    def __init__(self, key: str, label: str, category: str, weight: float):
+        self.key = key
+        self.label = label
+        self.category = category
+        self.weight = weight
+
+    def rank(self) -> tuple:
+        # Heaviest first, then the shorter (more general) name, then alphabetical
+        return (-self.weight, len(self.key), self.key)
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: dict[str, "_Node"] = {}
+        # Best terms under this node, best first. Replaced, never mutated, so readers need no lock
+        self.top: tuple[_Term, ...] = ()
+
+
+class PrefixIndex:
+    """
+    Trie over normalized terms in which every node keeps the best `top_k`
+    terms of its subtree, so a lookup walks one node per query character and
+    never visits the (possibly thousands of) terms sharing a short prefix.
+
+    Weights may only grow in place (increment); build a new index to drop
+    terms or lower weights.
+    """
+
+    def __init__(self, terms: Iterable[tuple[str, str, float]] = (), top_k: int = 10):
+        """`terms` are (label, category, weight); the first label seen for a key wins."""
+        self.top_k = top_k
+        self._root = _Node()
+        self._terms: dict[str, _Term] = {}
+        self._lock = threading.Lock()
+        for label, category, weight in terms:
+            key = normalize(label)
+            if key and key not in self._terms:
+                self._terms[key] = _Term(key, label, category, weight)
+
+        # Inserting in rank order means each node's first top_k arrivals are its best
+        for term in sorted(self._terms.values(), key=_Term.rank):
+            node = self._root
+            for ch in term.key:
+                node = node.children.setdefault(ch, _Node())
+                if len(node.top) < top_k:
+                    node.top += (term,)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, text: str) -> bool:
+        return normalize(text) in self._terms
+
+    def lookup(self, prefix: str, limit: Optional[int] = None) -> list[tuple[str, str]]:
+        """Best (label, category) pairs whose key starts with `prefix`, best first."""
+        key = normalize(prefix)
+        if not key:
+            return []
+        node = self._root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [(term.label, term.category) for term in node.top[:limit or self.top_k]]
+
+    def increment(self, text: str, amount: float = 1) -> bool:
+        """Add `amount` to an existing term's weight. Returns False for unknown terms."""
+        term = self._terms.get(normalize(text))
+        if term is None:
+            return False
+        with self._lock:
+            term.weight += amount
+            rank = term.rank()
+            node = self._root
+            for ch in term.key:
+                node = node.children[ch]
+                top = node.top
+                # Only this term moved, and only upwards: it either reorders within
+                # the node's best list or pushes out the weakest entry
+                if term in top:
+                    node.top = tuple(sorted(top, key=_Term.rank))
+                elif len(top) < self.top_k or rank < top[-1].rank():
+                    node.top = tuple(sorted(top + (term,), key=_Term.rank))[:self.top_k]
+        return True
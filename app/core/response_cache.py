@@ -0,0 +1,167 @@
+# app/core/response_cache.py
+import json
+import threading
+from typing import Any, Optional
+import redis
+import redis.asyncio as aioredis
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+
+class ResponseCache:
+    """
+    Key/value cache for JSON-serializable responses, with sync and async access.
+
+    Backends only store and fetch; keys carry the data version, so entries
+    are never invalidated, they just stop being asked for and age out.
+    Backend errors are counted and treated as misses.
+    """
+
+    backend = "none"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _get(self, key: str) -> Optional[Any]:
+        return None
+
+    def _set(self, key: str, value: Any):
+        pass
+
+    async def _aget(self, key: str) -> Optional[Any]:
+        return self._get(key)
+
+    async def _aset(self, key: str, value: Any):
+        self._set(key, value)
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            value = self._get(key)
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️ Response cache read failed: {e}")
+            value = None
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key: str, value: Any):
+        try:
+            self._set(key, value)
+            self._count("stores")
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️ Response cache write failed: {e}")
+
+    async def aget(self, key: str) -> Optional[Any]:
+        try:
+            value = await self._aget(key)
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️ Response cache read failed: {e}")
+            value = None
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    async def aset(self, key: str, value: Any):
+        try:
+            await self._aset(key, value)
+            self._count("stores")
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️ Response cache write failed: {e}")
+
+    async def aclose(self):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "backend": self.backend,
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+class LocalResponseCache(ResponseCache):
+    """In-process LRU; bounded by `max_entries`, per worker."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        super().__init__()
+        self.lru = LRUCache(max_entries, ttl_seconds)
+
+    def _get(self, key: str) -> Optional[Any]:
+        return self.lru.get(key)
+
+    def _set(self, key: str, value: Any):
+        self.lru.set(key, value)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "size": len(self.lru), "evictions": self.lru.evictions}
+
+
+class RedisResponseCache(ResponseCache):
+    """
+    Redis-backed cache shared by every worker. Entries expire after
+    `ttl_seconds`; the overall size bound is the server's maxmemory with an
+    LRU eviction policy (e.g. allkeys-lru).
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str, ttl_seconds: int, timeout: float):
+        super().__init__()
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self._client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._async_client: Optional[aioredis.Redis] = None
+
+    def _aclient(self) -> aioredis.Redis:
+        # Created lazily so it binds to the running event loop
+        if self._async_client is None:
+            self._async_client = aioredis.Redis.from_url(
+                self.url, socket_timeout=self.timeout, socket_connect_timeout=self.timeout
+            )
+        return self._async_client
+
+    def _get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def _set(self, key: str, value: Any):
+        self._client.set(key, json.dumps(value, default=str), ex=self.ttl_seconds)
+
+    async def _aget(self, key: str) -> Optional[Any]:
+        raw = await self._aclient().get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def _aset(self, key: str, value: Any):
+        await self._aclient().set(key, json.dumps(value, default=str), ex=self.ttl_seconds)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self._client.close()
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the cache selected by AI_CACHE_BACKEND ("memory", "redis" or "none")."""
+    backend = settings.AI_CACHE_BACKEND.lower()
+    if backend == "redis":
+        print(f"✅ AI response cache: Redis at {settings.REDIS_URL}")
+        return RedisResponseCache(
+            settings.REDIS_URL, settings.AI_CACHE_TTL_SECONDS, settings.AI_CACHE_REDIS_TIMEOUT_SECONDS
+        )
+    if backend == "memory":
+        return LocalResponseCache(settings.AI_CACHE_MAX_ENTRIES, settings.AI_CACHE_TTL_SECONDS)
+    return ResponseCache()
@@ -0,0 +1,91 @@
+# app/core/single_flight.py
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    """One in-progress synchronous computation and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one computation.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in progress wait for it and receive the same result (or exception).
+    Nothing is kept after the call finishes, so this is not a cache: the
+    next call for the key computes again.
+
+    `do` is for threadpool code and `do_async` for the event loop; they keep
+    separate in-flight tables but share the counters.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args) -> Any:
+        # Tasks belong to one event loop, so the table is per loop
+        key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(fn(*args))
+                task.add_done_callback(lambda t: self._forget(key, t))
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+
+        # Shielded so one caller disconnecting does not cancel the shared work
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls) + len(self._tasks),
+            }
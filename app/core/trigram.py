@@ -0,0 +1,75 @@
+# app/core/trigram.py
+import heapq
+import re
+from collections import defaultdict
+from typing import Iterable, Optional
+
+# Like pg_trgm: words are runs of letters/digits, lowercased, padded "  word "
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: Optional[str]) -> set[str]:
+    grams = set()
+    for word in _WORD.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    In-memory inverted index from trigrams to documents, each with a name and
+    an optional description: a pure-Python stand-in for pg_trgm GIN indexes.
+
+    A document's score for a query is the share of the query's trigrams found
+    in its best field, close to pg_trgm's word_similarity. Documents holding
+    the query as a plain substring always match, like the ILIKE that the
+    PostgreSQL path ORs in.
+    """
+
+    def __init__(self, documents: Iterable[tuple[int, str, Optional[str]]]):
+        self._ids: list[int] = []
+        self._texts: list[tuple[str, str]] = []
+        # trigram -> posting keys (position * 2 + field, field 0 = name, 1 = description)
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        for position, (doc_id, name, description) in enumerate(documents):
+            self._ids.append(doc_id)
+            self._texts.append(((name or "").lower(), (description or "").lower()))
+            for field, text in enumerate((name, description)):
+                for gram in trigrams(text):
+                    self._postings[gram].append(position * 2 + field)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(self, query: str, threshold: float, limit: int) -> list[tuple[int, float]]:
+        """Best `limit` (doc id, score) pairs scoring at least `threshold`, best first."""
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        grams = trigrams(query)
+        hits: dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for key in self._postings.get(gram, ()):
+                hits[key] += 1
+
+        # A text containing a query word of 3+ characters shares that word's first
+        # trigram, so the postings found it. Shorter fragments ("et" in "netflix",
+        # "%_") may share none, so those queries scan for the substring
+        if not any(len(word) >= 3 for word in _WORD.findall(needle)):
+            for position, texts in enumerate(self._texts):
+                for field, text in enumerate(texts):
+                    if needle in text:
+                        hits[position * 2 + field] += 0
+
+        scores: dict[int, float] = {}
+        for key, count in hits.items():
+            position = key >> 1
+            score = count / len(grams) if grams else 0.0
+            if score < threshold and needle in self._texts[position][key & 1]:
+                score = threshold
+            if score >= threshold and score > scores.get(position, 0.0):
+                scores[position] = score
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -self._ids[item[0]]))
+        return [(self._ids[position], round(score, 4)) for position, score in best]
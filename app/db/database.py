@@ -14,4 +14,15 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def dialect_insert(db):
+    """
+    Return the dialect-specific insert() construct for the session's engine,
+    so services can use ON CONFLICT upserts on PostgreSQL (and SQLite in tests).
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey,Numeric,Boolean,Date
+from sqlalchemy import Column, Integer, String, ForeignKey,Numeric,Boolean,Date,DateTime,JSON,UniqueConstraint,Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime,date
@@ -11,6 +11,8 @@ class User(Base):
     username = Column(String, unique = True, index = True)
     email = Column(String, unique = True, index = True, nullable = False)
     hashed_password = Column(String, nullable = False)
+    # Bumped on every change to the user's subscriptions or budget; keys derived AI results
+    data_version = Column(Integer, nullable = False, default = 0, server_default = "0")
 
     #one to many relationship with subscriptions
     subscriptions = relationship("Subscription", back_populates="owner")
@@ -19,13 +21,28 @@ class User(Base):
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        # Keyset pagination of one user's list, per sort order
+        Index("ix_subscriptions_owner_id_id", "owner_id", "id"),
+        Index("ix_subscriptions_owner_renewal_date_id", "owner_id", "renewal_date", "id"),
+        Index("ix_subscriptions_owner_price_id", "owner_id", "price", "id"),
+        Index("ix_subscriptions_owner_row_version_id", "owner_id", "row_version", "id"),
+    )
 
     id = Column(Integer, primary_key = True, index = True)
     name = Column(String, index = True, nullable = False)
     description = Column(String, nullable = True)
     price = Column(Numeric(10,2), nullable = False)
-    renewal_date = Column(Date, nullable = False)
+    renewal_date = Column(Date, nullable = False, index = True)
     category = Column(String, nullable = False)
+    # "pending" while the background worker resolves the category, then "resolved"
+    category_status = Column(String, nullable = False, default = "resolved", server_default = "resolved", index = True)
+    # "weekly" | "monthly" | "yearly" | "custom"; custom renews every billing_interval_days
+    billing_cycle = Column(String, nullable = False, default = "monthly", server_default = "monthly")
+    billing_interval_days = Column(Integer, nullable = True)
+    # The owner's data_version when the row last changed; drives /sync
+    row_version = Column(Integer, nullable = False, default = 0, server_default = "0")
+    updated_at = Column(DateTime, nullable = False, default = datetime.utcnow, onupdate = datetime.utcnow)
 
     owner_id = Column(Integer, ForeignKey("users.id"))#foreig key to connect to user table
     owner = relationship("User", back_populates="subscriptions")
@@ -37,8 +54,131 @@ class Budget(Base):
     monthly_limit = Column(Numeric(10, 2), nullable=False)
     current_spent = Column(Numeric(10, 2), default=0.00)
     allow_over_limit = Column(Boolean, default=False)
-
+    # The owner's data_version when the row last changed; drives /sync
+    row_version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user_id = Column(Integer, ForeignKey("users.id"), unique=True)
     user = relationship("User", back_populates="budget")
 
+
+class SyncTombstone(Base):
+    """Deleted subscription or budget, kept so /sync can tell clients to drop it."""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (Index("ix_sync_tombstones_user_row_version", "user_id", "row_version"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entity = Column(String, nullable=False)  # subscription | budget
+    entity_id = Column(Integer, nullable=False)
+    row_version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class NotificationOutbox(Base):
+    """Pending reminder digests, written by the daily scan and delivered by the drain loop."""
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    recipient = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)  # {"due_soon": [...], "overdue": [...]}
+    status = Column(String, nullable=False, default="pending", index=True)  # pending | sent | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+
+class SubscriptionNotificationState(Base):
+    """Last reminder state emitted per subscription, so reruns only send what changed."""
+    __tablename__ = "subscription_notification_state"
+
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String, nullable=False)  # due_soon | overdue
+    renewal_date = Column(Date, nullable=False)
+    notified_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ServiceCatalog(Base):
+    """Shared service -> category answers from the LLM, reused across all users."""
+    __tablename__ = "service_catalog"
+
+    normalized_key = Column(String, primary_key=True)  # normalized "name|description"
+    name = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    source = Column(String, nullable=False, default="llm")
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class MonthlyReport(Base):
+    """Monthly report precomputed off-peak; valid while data_version matches the user's."""
+    __tablename__ = "monthly_reports"
+    __table_args__ = (UniqueConstraint("user_id", "month", name="uq_monthly_reports_user_month"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    month = Column(String, nullable=False)  # "YYYY-MM"
+    data_version = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    generated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class UserCategoryTotal(Base):
+    """Per-user, per-category subscription count and spend, maintained alongside subscription writes."""
+    __tablename__ = "user_category_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String, primary_key=True)
+    subscription_count = Column(Integer, nullable=False, default=0)
+    total_price = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class SpendLedgerEntry(Base):
+    """
+    Append-only record of one renewal charge. Rows are never updated, so
+    history survives renewals, edits and deletes of the subscription.
+    """
+    __tablename__ = "spend_ledger"
+    __table_args__ = (
+        # One charge per subscription per renewal date makes posting idempotent
+        UniqueConstraint("subscription_id", "charged_on", name="uq_spend_ledger_subscription_charge"),
+        Index("ix_spend_ledger_user_charged_on", "user_id", "charged_on"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id", ondelete="SET NULL"), nullable=True)
+    name = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+    charged_on = Column(Date, nullable=False)
+    recorded_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class SubscriptionChargeState(Base):
+    """
+    How far the ledger has charged each subscription. renewal_date stays the
+    user's own data; the schedule it was computed from is kept here so an
+    edit to the date or cycle reschedules the next charge.
+    """
+    __tablename__ = "subscription_charge_state"
+
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), primary_key=True)
+    renewal_date = Column(Date, nullable=False)
+    billing_cycle = Column(String, nullable=False)
+    billing_interval_days = Column(Integer, nullable=True)
+    charged_through = Column(Date, nullable=False)  # date of the last charge posted
+    next_charge_on = Column(Date, nullable=False, index=True)
+
+
+class MonthlySpendRollup(Base):
+    """Ledger totals per user, month and category; the primary key serves month-range reads."""
+    __tablename__ = "monthly_spend_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)  # first day of the month
+    category = Column(String, primary_key=True)
+    total = Column(Numeric(12, 2), nullable=False, default=0)
+    charge_count = Column(Integer, nullable=False, default=0)
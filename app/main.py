@@ -4,8 +4,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from app.core.rate_limiter import limiter
-from app.routers import auth, budget, subscriptions, ai
+from app.routers import auth, budget, subscriptions, ai, admin, analytics, sync
 from app.scheduler import start_scheduler, shutdown_scheduler
+from app.services.categorization_worker import shutdown_categorization_worker
+from app.core.llm_client import aclose_clients
+from app.services.ai_results import ai_response_cache
+from app.services.category_totals import backfill_category_totals
+from app.services.search import ensure_search_indexes
+from app.services.suggestions import rebuild_suggestion_index
 from contextlib import asynccontextmanager
 import asyncio
 
@@ -20,10 +26,20 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting up Spendly backend...")
     # Wait until event loop is running
     await asyncio.sleep(0.1)
+    backfilled = await asyncio.to_thread(backfill_category_totals)
+    if backfilled:
+        print(f"📊 Backfilled {backfilled} category total rows.")
+    if await asyncio.to_thread(ensure_search_indexes):
+        print("🔎 Trigram search indexes ready.")
+    suggestions = await asyncio.to_thread(rebuild_suggestion_index)
+    print(f"🔤 Autocomplete index built with {suggestions} names.")
     start_scheduler()
     print("✅ Scheduler started inside lifespan.")
     yield
     shutdown_scheduler()
+    shutdown_categorization_worker()
+    await aclose_clients()
+    await ai_response_cache.aclose()
     print("👋 Application shutdown. Scheduler stopped.")
 
 
@@ -52,6 +68,9 @@ app.include_router(auth.router)
 app.include_router(budget.router)
 app.include_router(subscriptions.router)
 app.include_router(ai.router)
+app.include_router(admin.router)
+app.include_router(analytics.router)
+app.include_router(sync.router)
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Spendly Backend API!"}
\ No newline at end of file
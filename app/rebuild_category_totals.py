@@ -0,0 +1,14 @@
+# rebuild_category_totals.py
+# Usage: python -m app.rebuild_category_totals
+from app.db.database import SessionLocal
+from app.services.category_totals import rebuild_category_totals
+
+print("Rebuilding user_category_totals from subscriptions...")
+db = SessionLocal()
+try:
+    rows = rebuild_category_totals(db)
+    db.commit()
+finally:
+    db.close()
+
+print(f"✅ Rebuilt {rows} category total rows.")
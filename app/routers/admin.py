@@ -0,0 +1,54 @@
+# app/routers/admin.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.db.database import get_db
+from app.db.models import User
+from app.services.auth_service import get_current_admin
+from app.services.bulk_recategorizer import start_recategorization, get_recategorization_job
+from app.services.category_cache import category_cache
+from app.services.category_totals import rebuild_category_totals
+from app.services.ai_results import ai_flights, ai_response_cache
+from app.core.llm_client import admission, breaker
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+# ---------- BULK RE-CATEGORIZATION ----------
+@router.post("/recategorize", status_code=status.HTTP_202_ACCEPTED)
+def trigger_recategorization(current_user: User = Depends(get_current_admin)):
+    """
+    Start re-categorizing every subscription stuck in "Other".
+    Returns the running job if one is already in progress.
+    """
+    return start_recategorization().to_dict()
+
+
+@router.get("/recategorize/{job_id}")
+def recategorization_status(job_id: str, current_user: User = Depends(get_current_admin)):
+    """Report progress of a bulk re-categorization job."""
+    job = get_recategorization_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job.to_dict()
+
+
+# ---------- ROLLUPS ----------
+@router.post("/category-totals/rebuild")
+def rebuild_category_rollup(db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+    """Recompute user_category_totals from the subscriptions table to repair drift."""
+    rows = rebuild_category_totals(db)
+    db.commit()
+    return {"rebuilt_rows": rows}
+
+
+# ---------- METRICS ----------
+@router.get("/metrics")
+def service_metrics(current_user: User = Depends(get_current_admin)):
+    """Cache and LLM usage counters."""
+    return {
+        "categorization_cache": category_cache.stats(),
+        "llm_circuit_breaker": breaker.snapshot(),
+        "llm_admission": admission.stats(),
+        "ai_single_flight": ai_flights.stats(),
+        "ai_response_cache": ai_response_cache.stats(),
+    }
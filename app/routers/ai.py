@@ -1,24 +1,65 @@
 from fastapi import APIRouter, Depends, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.db.database import get_db
 from app.services.auth_service import get_current_user
-from app.services.ai_cost_intelligence import generate_cost_insights
+from app.services.ai_cost_intelligence import cost_insights_events, cost_insights_result_async
 from app.db.models import User
-from app.services.ai_monthly_report import generate_monthly_report
+from app.services.ai_monthly_report import monthly_report_events, monthly_report_result_async
+from app.services.ai_results import get_ai_result_async, replay_sse, stream_ai_result
+from app.services.monthly_report_store import get_stored_monthly_report, report_month
 
 router = APIRouter(prefix="/ai", tags=["AI Intelligence"])
 
+# Handlers are async so a pending completion holds no threadpool thread;
+# DB work inside the services is still offloaded to the threadpool.
+# Results are cached per user data version, and concurrent duplicates share one run.
+
 @router.get("/cost-summary")
-def ai_cost_summary(
-    db: Session = Depends(get_db),
+async def ai_cost_summary(
     current_user:User=Depends(get_current_user)
 ):
-    return generate_cost_insights(db, current_user.id)
+    return await get_ai_result_async("cost-summary", current_user, cost_insights_result_async)
 
 @router.get("/monthly-report", status_code=status.HTTP_200_OK)
-def ai_monthly_report(
+async def ai_monthly_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
     ):
     """Generate an AI-driven monthly finance summary comparing current and previous months."""
-    return generate_monthly_report(db, current_user.id)
+    # The report compares calendar months, so it also changes when the month rolls over
+    month = report_month()
+    # Precomputed off-peak and still current? Then it's a single indexed read
+    stored = await run_in_threadpool(get_stored_monthly_report, db, current_user.id, month, current_user.data_version)
+    if stored is not None:
+        return stored
+    return await get_ai_result_async("monthly-report", current_user, monthly_report_result_async, scope=month)
+
+
+# ---------- STREAMING (server-sent events) ----------
+# The numbers arrive as the first event, then LLM tokens as they are generated.
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+@router.get("/cost-summary/stream")
+async def ai_cost_summary_stream(current_user: User = Depends(get_current_user)):
+    return StreamingResponse(
+        stream_ai_result("cost-summary", current_user, cost_insights_events),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
+
+@router.get("/monthly-report/stream")
+async def ai_monthly_report_stream(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Streaming variant of /ai/monthly-report."""
+    month = report_month()
+    stored = await run_in_threadpool(get_stored_monthly_report, db, current_user.id, month, current_user.data_version)
+    return StreamingResponse(
+        replay_sse(stored) if stored is not None
+        else stream_ai_result("monthly-report", current_user, monthly_report_events, scope=month),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
@@ -0,0 +1,46 @@
+# app/routers/analytics.py
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.rate_limiter import limiter
+from app.db.database import get_db
+from app.db.models import User
+from app.services.auth_service import get_current_user
+from app.services.export import MEDIA_TYPES, ExportFormat, export_filename, ledger_export_query, stream_export
+from app.services.spend_ledger import get_spend_timeseries
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+# ---------- SPEND TIME SERIES ----------
+@router.get("/timeseries")
+def spend_timeseries(
+    months: int = Query(12, ge=1, le=settings.ANALYTICS_MAX_MONTHS),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Charged spend per month (oldest first) with a per-category breakdown, from the spend ledger."""
+    return {"months": months, "series": get_spend_timeseries(db, current_user.id, months)}
+
+
+# ---------- SPEND HISTORY EXPORT ----------
+@router.get("/ledger/export")
+@limiter.limit("5/minute")
+def export_spend_history(
+    request: Request,
+    format: ExportFormat = Query("csv"),
+    category: Optional[str] = None,
+    charged_from: Optional[date] = None,
+    charged_to: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """Download posted charges from the spend ledger as CSV or NDJSON, streamed oldest first."""
+    stmt = ledger_export_query(current_user.id, category, charged_from, charged_to)
+    return StreamingResponse(
+        stream_export(stmt, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename("spend-history", format)}"'},
+    )
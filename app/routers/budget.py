@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.schemas.budget_schema import (
     BudgetCreate,
     BudgetUpdate,
     BudgetResponse,
-    BudgetSummary
+    BudgetSummary,
+    BudgetOptimizeRequest
 )
 from app.services.budget_service import (
     create_budget,
@@ -15,6 +16,10 @@ from app.services.budget_service import (
     get_budget_summary
 )
 from app.services.auth_service import get_current_user
+from app.services.forecast import forecast_user_spend
+from app.services.budget_optimizer import optimize_budget
+from app.core.config import settings
+from app.services.data_version import bump_data_version
 from app.core.rate_limiter import limiter  # Use this instead
 from app.db.models import User, Budget
 from fastapi import HTTPException
@@ -74,6 +79,30 @@ def budget_summary(
 ):
     return get_budget_summary(db, current_user.id)
 
+# ---------- FORECAST ----------
+@router.get("/forecast")
+@limiter.limit("10/minute")
+def budget_forecast(
+    request: Request,
+    months: int = Query(12, ge=1, le=settings.FORECAST_MAX_MONTHS),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Projected spend per month and category from each subscription's billing cycle."""
+    return forecast_user_spend(db, current_user.id, months)
+
+# ---------- OPTIMIZE ----------
+@router.post("/optimize")
+@limiter.limit("10/minute")
+async def budget_optimize(
+    request: Request,
+    options: BudgetOptimizeRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cheapest-in-value set of cancellations/downgrades that brings monthly spend under the target."""
+    return await optimize_budget(db, current_user.id, options)
+
 #------------TOGGLE ALLOW OVER LIMIT -----------
 @router.patch("/toggle-overlimit")
 def toggle_over_limit(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -82,6 +111,7 @@ def toggle_over_limit(db: Session = Depends(get_db), current_user: User = Depend
         raise HTTPException(status_code=404, detail="Budget not found")
     
     budget.allow_over_limit = not budget.allow_over_limit
+    budget.row_version = bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(budget)
     return {"allow_over_limit": budget.allow_over_limit}
@@ -1,42 +1,137 @@
-from fastapi import APIRouter, Depends, Request, status
+from datetime import date, timedelta
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 from app.db.database import get_db
-from app.schemas.sub_schema import SubscriptionCreate, SubscriptionUpdate, SubscriptionResponse
+from app.schemas.sub_schema import SubscriptionCreate, SubscriptionUpdate, SubscriptionResponse, SubscriptionSuggestion
 from app.services.subscription_service import (
     create_subscription,
-    get_subscriptions,
+    list_subscriptions_page,
     get_subscription_by_id,
     update_subscription,
     delete_subscription,
     get_subscription_by_name
 )
+from app.services.subscription_import import (
+    ImportFormat,
+    ImportMode,
+    detect_format,
+    import_subscription_stream
+)
+from app.services.export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    export_filename,
+    stream_export,
+    subscription_export_query
+)
+from app.services.suggestions import suggest_names
 from app.services.auth_service import get_current_user
 from app.core.rate_limiter import limiter
+from app.core.config import settings
 from app.db.models import User
 
 
 router = APIRouter(prefix="/subscriptions", tags=["Subscriptions"])
 
 # ---------- CREATE ----------
-@router.post("/", response_model=None, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=SubscriptionResponse, status_code=status.HTTP_201_CREATED)
 def create_subscription_route(
     sub_data: SubscriptionCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """
+    Create a subscription. When no category is given, a provisional one is
+    returned with category_status="pending" and refined in the background.
+    """
     new_sub = create_subscription(db=db, user=current_user, sub_data=sub_data)
     return new_sub
 
+# ---------- BULK IMPORT ----------
+@router.post("/import")
+@limiter.limit("5/minute")
+async def import_subscriptions_route(
+    request: Request,
+    format: Optional[ImportFormat] = Query(None, description="csv or ndjson; defaults from Content-Type"),
+    mode: ImportMode = Query("best_effort"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Import many subscriptions from a streamed CSV (header row required) or
+    NDJSON body. best_effort skips invalid rows; all_or_nothing saves nothing
+    unless every row is valid. Per-row errors are reported either way.
+    """
+    fmt = format or detect_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson."
+        )
+    return await run_in_threadpool(import_subscription_stream, db, current_user, request, fmt, mode)
+
+# ---------- STREAMING EXPORT ----------
+@router.get("/export")
+@limiter.limit("5/minute")
+def export_subscriptions(
+    request: Request,
+    format: ExportFormat = Query("csv"),
+    category: Optional[str] = None,
+    renewal_from: Optional[date] = None,
+    renewal_to: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Download subscriptions as CSV or NDJSON, optionally filtered by category
+    and renewal-date range (inclusive). Rows are streamed from a server-side
+    cursor, so large accounts do not load into memory.
+    """
+    stmt = subscription_export_query(current_user.id, category, renewal_from, renewal_to)
+    return StreamingResponse(
+        stream_export(stmt, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename("subscriptions", format)}"'},
+    )
+
 # ---------- READ ALL ----------
-@router.get("/", response_model=List[SubscriptionResponse])
+@router.get("/", response_model=None, responses={200: {"model": List[SubscriptionResponse]}})
 @limiter.limit("10/minute")
 def list_subscriptions(
     request: Request,
+    response: Response,
+    limit: int = Query(settings.SUBSCRIPTIONS_PAGE_DEFAULT, ge=1, le=settings.SUBSCRIPTIONS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    sort: str = Query("id", description="id, renewal_date or price; prefix with - for descending"),
+    category: Optional[str] = None,
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    renewal_from: Optional[date] = None,
+    renewal_to: Optional[date] = None,
+    due_within_days: Optional[int] = Query(None, ge=0, description="Shortcut for renewal_from=today, renewal_to=today+N"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. name,price"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # ✅ Added type annotation
 ):
-    return get_subscriptions(db, current_user.id)
+    """
+    One page of subscriptions. When more follow, the X-Next-Cursor header
+    holds the cursor to pass back (with the same sort and filters).
+    """
+    if due_within_days is not None:
+        renewal_from = date.today()
+        renewal_to = renewal_from + timedelta(days=due_within_days)
+    rows, next_cursor = list_subscriptions_page(
+        db, current_user.id, limit, cursor, sort,
+        category=category, min_price=min_price, max_price=max_price,
+        renewal_from=renewal_from, renewal_to=renewal_to,
+        fields=[field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 
 # ---------- SEARCH BY NAME ----------
@@ -45,14 +140,31 @@ def list_subscriptions(
 def search_subscriptions(
     request: Request,
     name: str,
+    limit: int = Query(settings.SEARCH_MAX_RESULTS, ge=1, le=settings.SEARCH_MAX_RESULTS),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # ✅ Added type annotation
 ):
     """
-    Search subscriptions by name (case-insensitive, partial match).
-    Example: /subscriptions/search/?name=netflix
+    Fuzzy search by name or description, best match first; small typos are tolerated.
+    Example: /subscriptions/search/?name=netflx
+    """
+    return get_subscription_by_name(db, name, current_user.id, limit)
+
+# ---------- NAME AUTOCOMPLETE ----------
+@router.get("/suggest", response_model=List[SubscriptionSuggestion])
+@limiter.limit("120/minute")
+def suggest_subscription_names(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(settings.SUGGEST_MAX_RESULTS, ge=1, le=settings.SUGGEST_MAX_RESULTS),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Service names starting with `q`, most used first, with their category,
+    so clients can offer one canonical spelling per keystroke.
+    Example: /subscriptions/suggest?q=net
     """
-    return get_subscription_by_name(db, name, current_user.id)
+    return suggest_names(q, limit)
 
 # ---------- READ SINGLE ----------
 @router.get("/{sub_id}", response_model=SubscriptionResponse)
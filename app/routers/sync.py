@@ -0,0 +1,27 @@
+# app/routers/sync.py
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import get_db
+from app.db.models import User
+from app.services.auth_service import get_current_user
+from app.services.sync import get_changes
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+# ---------- DELTA SYNC ----------
+@router.get("")
+def sync_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous response; omit for a full sync"),
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Subscriptions and budget changed since `since`, plus deletions. Apply the
+    changes, store `cursor`, and call again right away while has_more is true.
+    reset=true means the client should drop its local copy first.
+    """
+    return get_changes(db, current_user.id, since, limit)
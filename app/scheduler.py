@@ -2,52 +2,114 @@
 
 # Import AsyncIOScheduler instead of BackgroundScheduler
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from app.services.due_subscriptions import get_due_subscriptions
-from app.services.email_service import send_due_reminder
-from app.db.database import SessionLocal
-from app.db.models import User
+from app.services.notification_outbox import enqueue_due_reminders, drain_outbox
+from app.services.smtp_dispatcher import create_dispatcher
+from app.services.categorization_worker import resolve_pending_categories
+from app.services.category_cache import purge_expired_catalog_entries
+from app.services.monthly_report_store import precompute_monthly_reports
+from app.services.spend_ledger import post_renewal_charges
+from app.services.sync import purge_tombstones
+from app.services.suggestions import rebuild_suggestion_index
+from app.core.config import settings
 from datetime import datetime
 import traceback
 import asyncio 
 
-# Keep the detailed check_due_subscriptions function for now
 def check_due_subscriptions():
     """
     Runs automatically to check for upcoming or overdue subscriptions
-    and sends reminder emails to users.
+    and queues reminder emails for users.
+
+    Only subscriptions whose due/overdue state changed since the last run
+    are queued (one digest per user), so reruns are cheap and an overdue
+    subscription is not re-announced every day. Delivery happens in
+    drain_notification_outbox.
     """
     print(f"[{datetime.now()}] 👉 JOB START: check_due_subscriptions")
-    db = None
     try:
-        # Use a context manager for the DB session in an async context
-        # Although this function itself isn't async, using SessionLocal directly is okay here
-        db = SessionLocal()
-        print(f"[{datetime.now()}]    DB session created.")
-        users = db.query(User).all()
-        print(f"[{datetime.now()}]    Found {len(users)} users.")
-
-        if not users:
-             print(f"[{datetime.now()}]    No users found in the database. Skipping checks.")
-
-        for user in users:
-            print(f"[{datetime.now()}]    Checking user {user.id} ({user.email})...")
-            result = get_due_subscriptions(db, user.id)
-            if result.get("due_soon") or result.get("overdue"):
-                print(f"[{datetime.now()}]    User {user.id} has due/overdue subs. Attempting email...")
-                # Assuming send_due_reminder is synchronous
-                send_due_reminder(user.email, result)
-            else:
-                print(f"[{datetime.now()}]    User {user.id} has no due/overdue subs.")
-
+        enqueued = enqueue_due_reminders()
+        print(f"[{datetime.now()}]    Queued {enqueued} reminder digests.")
     except Exception as e:
         print(f"[{datetime.now()}] 💥 ERROR in check_due_subscriptions: {e}")
         print(traceback.format_exc())
+    else:
+        drain_notification_outbox()
     finally:
-        if db:
-            db.close()
-            print(f"[{datetime.now()}]    DB session closed.")
         print(f"[{datetime.now()}] 🏁 JOB END: check_due_subscriptions")
 
+
+def drain_notification_outbox():
+    """Deliver pending reminder digests through the pooled SMTP dispatcher."""
+    dispatcher = None
+    try:
+        dispatcher = create_dispatcher()
+        processed = drain_outbox(dispatcher)
+        if processed:
+            print(f"[{datetime.now()}]    📬 Outbox drained: {processed} digests processed.")
+    except Exception as e:
+        print(f"[{datetime.now()}] 💥 ERROR in drain_notification_outbox: {e}")
+        print(traceback.format_exc())
+    finally:
+        if dispatcher:
+            dispatcher.close()
+
+def sweep_pending_categories():
+    """Re-queue subscriptions whose background categorization never finished."""
+    try:
+        queued = resolve_pending_categories()
+        if queued:
+            print(f"[{datetime.now()}]    🏷️ Re-queued {queued} pending categorizations.")
+    except Exception as e:
+        print(f"[{datetime.now()}] 💥 ERROR in sweep_pending_categories: {e}")
+        print(traceback.format_exc())
+
+def purge_service_catalog():
+    """Evict service_catalog entries past their TTL."""
+    try:
+        removed = purge_expired_catalog_entries()
+        print(f"[{datetime.now()}]    🧹 Purged {removed} expired service catalog entries.")
+    except Exception as e:
+        print(f"[{datetime.now()}] 💥 ERROR in purge_service_catalog: {e}")
+        print(traceback.format_exc())
+
+def purge_sync_tombstones():
+    """Forget deletions older than the sync retention window."""
+    try:
+        removed = purge_tombstones()
+        print(f"[{datetime.now()}]    🧹 Purged {removed} expired sync tombstones.")
+    except Exception as e:
+        print(f"[{datetime.now()}] 💥 ERROR in purge_sync_tombstones: {e}")
+        print(traceback.format_exc())
+
+def refresh_suggestions():
+    """Rebuild the autocomplete index so new popular names, renames and deletes show up."""
+    try:
+        rebuild_suggestion_index()
+    except Exception as e:
+        print(f"[{datetime.now()}] 💥 ERROR in refresh_suggestions: {e}")
+        print(traceback.format_exc())
+
+def precompute_reports():
+    """Build stale or missing monthly reports off-peak, so the endpoint serves stored rows."""
+    print(f"[{datetime.now()}] 👉 JOB START: precompute_reports")
+    try:
+        stored = precompute_monthly_reports()
+        print(f"[{datetime.now()}]    📊 Stored {stored} monthly reports.")
+    except Exception as e:
+        print(f"[{datetime.now()}] 💥 ERROR in precompute_reports: {e}")
+        print(traceback.format_exc())
+    finally:
+        print(f"[{datetime.now()}] 🏁 JOB END: precompute_reports")
+
+def post_renewals():
+    """Append today's renewal charges to the spend ledger and monthly rollups."""
+    try:
+        posted = post_renewal_charges()
+        print(f"[{datetime.now()}]    🧾 Posted {posted} renewal charges to the ledger.")
+    except Exception as e:
+        print(f"[{datetime.now()}] 💥 ERROR in post_renewals: {e}")
+        print(traceback.format_exc())
+
 # Use a global scheduler instance for AsyncIOScheduler
 scheduler = AsyncIOScheduler(timezone="UTC")
 
@@ -61,6 +123,46 @@ def start_scheduler():
     else:
          print("Job already exists in scheduler.")
 
+    if not scheduler.get_job("outbox_drainer"):
+        scheduler.add_job(
+            drain_notification_outbox, "interval",
+            seconds=settings.OUTBOX_DRAIN_INTERVAL_SECONDS, id="outbox_drainer",
+            max_instances=1, coalesce=True,
+        )
+
+    if not scheduler.get_job("category_sweeper"):
+        scheduler.add_job(
+            sweep_pending_categories, "interval",
+            seconds=settings.CATEGORIZATION_SWEEP_INTERVAL_SECONDS, id="category_sweeper",
+            max_instances=1, coalesce=True,
+        )
+
+    if not scheduler.get_job("catalog_purger"):
+        scheduler.add_job(purge_service_catalog, "cron", hour=3, minute=30, id="catalog_purger")
+
+    if not scheduler.get_job("tombstone_purger"):
+        scheduler.add_job(purge_sync_tombstones, "cron", hour=3, minute=45, id="tombstone_purger")
+
+    if not scheduler.get_job("suggestion_refresher"):
+        scheduler.add_job(
+            refresh_suggestions, "interval",
+            minutes=settings.SUGGEST_REFRESH_MINUTES, id="suggestion_refresher",
+            max_instances=1, coalesce=True,
+        )
+
+    if not scheduler.get_job("renewal_poster"):
+        scheduler.add_job(
+            post_renewals, "cron", hour=0, minute=15, id="renewal_poster",
+            max_instances=1, coalesce=True,
+        )
+
+    if not scheduler.get_job("report_precomputer"):
+        scheduler.add_job(
+            precompute_reports, "cron",
+            hour=settings.REPORT_PRECOMPUTE_HOUR, minute=0, id="report_precomputer",
+            max_instances=1, coalesce=True,
+        )
+
     # Start the scheduler if it's not already running
     if not scheduler.running:
         try:
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from decimal import Decimal
-from typing import Optional
+from typing import Annotated, Optional, List, Dict
 
 # ---------- BASE ----------
 class BudgetBase(BaseModel):
@@ -27,3 +27,17 @@ class BudgetSummary(BaseModel):
     monthly_limit: Decimal
     current_spent: Decimal
     remaining: Decimal
+
+# ---------- OPTIMIZE ----------
+class DowngradeOption(BaseModel):
+    subscription_id: int
+    price: Decimal = Field(..., ge=0)  # cheaper plan, same billing cycle
+    value_retained: float = Field(0.5, ge=0, le=1)
+
+class BudgetOptimizeRequest(BaseModel):
+    # Defaults to the budget's monthly_limit
+    target_spend: Optional[Decimal] = Field(None, ge=0)
+    keep: List[int] = []
+    # Relative value of a dollar spent in each category; unlisted categories weigh 1.0
+    category_weights: Dict[str, Annotated[float, Field(ge=0)]] = {}
+    downgrades: List[DowngradeOption] = []
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Literal, Optional
 from sqlalchemy import Date
 from datetime import date
 
+BillingCycle = Literal["weekly", "monthly", "yearly", "custom"]
+
 
 class SubscriptionBase(BaseModel):
     name: str
@@ -10,10 +12,16 @@ class SubscriptionBase(BaseModel):
     price: float
     renewal_date: date
     category: Optional[str] = None
+    billing_cycle: BillingCycle = "monthly"
+    billing_interval_days: Optional[int] = Field(default=None, gt=0)
 
 
 class SubscriptionCreate(SubscriptionBase):
-    pass
+    @model_validator(mode="after")
+    def check_interval(self):
+        if self.billing_cycle == "custom" and not self.billing_interval_days:
+            raise ValueError("billing_interval_days is required for a custom billing cycle")
+        return self
 
 
 class SubscriptionUpdate(BaseModel):
@@ -22,11 +30,19 @@ class SubscriptionUpdate(BaseModel):
     price: Optional[float] = None
     renewal_date: Optional[date] = None
     category: Optional[str] = None
+    billing_cycle: Optional[BillingCycle] = None
+    billing_interval_days: Optional[int] = Field(default=None, gt=0)
+
+
+class SubscriptionSuggestion(BaseModel):
+    name: str
+    category: str
 
 
 class SubscriptionResponse(SubscriptionBase):
     id: int
     owner_id: int
+    category_status: Optional[str] = None  # "pending" until categorization finishes
 
     # ✅ The only correct way in Pydantic v2
     model_config = ConfigDict(from_attributes=True)
@@ -1,31 +1,34 @@
 # app/services/ai_categorizer.py
-from groq import Groq
+import json
+from app.core.admission import PRIORITY_BACKGROUND
 from app.core.config import settings
+from app.core.llm_client import LLMUnavailable, chat_completion
+from app.services.category_cache import category_cache
 
-# ✅ Preferred models (top one tried first)
-PREFERRED_MODELS = [
-    "llama-3.3-70b-versatile",
-    "llama-3.1-8b-instant",
-    "gemma2-9b-it",
-]
-
-def _pick_available_model(client: Groq) -> str:
-    """Check which preferred model exists in your Groq account."""
-    try:
-        available = {m.id for m in client.models.list().data}
-        for m in PREFERRED_MODELS:
-            if m in available:
-                print(f"✅ Using Groq model: {m}")
-                return m
-    except Exception as e:
-        print(f"⚠️ Could not fetch models list: {e}")
-    print(f"⚙️ Defaulting to first preferred model: {PREFERRED_MODELS[0]}")
-    return PREFERRED_MODELS[0]
 
 def predict_category(name: str, description: str | None = None) -> str:
-    client = Groq(api_key=settings.GROQ_API_KEY)
-    model = _pick_available_model(client)
+    """
+    Categorize a service, asking the LLM only when neither the in-process
+    cache nor the shared service catalog knows the answer.
+    """
+    return category_cache.get_or_compute(
+        name, description, _ask_llm_for_category,
+        cacheable=lambda category: category != "Other",  # "Other" is the error fallback
+    )
+
 
+def predict_categories_cached(items: list[tuple[str, str | None]]) -> list[str]:
+    """
+    Batch form of predict_category: cached services are answered from the
+    cache tiers and the rest share a single LLM prompt.
+    """
+    return category_cache.get_or_compute_many(
+        items, predict_categories,
+        cacheable=lambda category: category != "Other",
+    )
+
+
+def _ask_llm_for_category(name: str, description: str | None = None) -> str:
     prompt = f"""
     You are a precise service categorizer.
     Given the name and description of a product, subscription, or company,
@@ -37,16 +40,66 @@ def predict_category(name: str, description: str | None = None) -> str:
     """
 
     try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are an expert at identifying services."},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.2,
+            priority=PRIORITY_BACKGROUND,
+            deadline=settings.LLM_BACKGROUND_DEADLINE_SECONDS,
             max_tokens=12,
         )
-        return (resp.choices[0].message.content or "").strip() or "Other"
-    except Exception as e:
+        return content or "Other"
+    except LLMUnavailable as e:
         print(f"[Groq fallback error] {e}")
         return "Other"
+
+
+def predict_categories(items: list[tuple[str, str | None]]) -> list[str]:
+    """
+    Categorize many services with a single LLM call.
+
+    `items` is a list of (name, description) pairs. Returns one category per
+    item, in order; items the model skipped or answered unclearly get "Other".
+    """
+    if not items:
+        return []
+
+    listing = "\n".join(
+        f"{i}. Name: {name} | Description: {description or 'N/A'}"
+        for i, (name, description) in enumerate(items)
+    )
+    prompt = f"""
+    You are a precise service categorizer.
+    For each numbered product, subscription, or company below, describe what type
+    of service it provides in 2–4 words
+    (e.g., "Credit Card Provider", "Streaming Platform", "Payment Gateway").
+    {listing}
+    Respond with JSON only, in the form:
+    {{"results": [{{"id": 0, "category": "Streaming Platform"}}, ...]}}
+    """
+
+    categories = ["Other"] * len(items)
+    try:
+        content = chat_completion(
+            [
+                {"role": "system", "content": "You are an expert at identifying services."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.2,
+            priority=PRIORITY_BACKGROUND,
+            deadline=settings.LLM_BACKGROUND_DEADLINE_SECONDS,
+            max_tokens=16 * len(items) + 32,
+            response_format={"type": "json_object"},
+        )
+        results = json.loads(content or "{}").get("results", [])
+        for entry in results:
+            idx = entry.get("id")
+            category = str(entry.get("category") or "").strip()
+            if isinstance(idx, int) and 0 <= idx < len(items) and category:
+                categories[idx] = category
+    except Exception as e:
+        print(f"[Groq batch fallback error] {e}")
+
+    return categories
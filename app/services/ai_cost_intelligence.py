@@ -1,33 +1,49 @@
 # app/services/ai_cost_intelligence.py
+from typing import Any, AsyncIterator, Optional
 from sqlalchemy.orm import Session
-from app.db.models import Subscription, Budget
+from starlette.concurrency import run_in_threadpool
+from app.db.models import Budget, User
+from app.services.ai_results import get_ai_result
+from app.services.category_totals import get_category_totals
 from app.core.config import settings
-from groq import Groq
+from app.core.llm_client import (
+    LLMDeadlineExceeded, LLMUnavailable, achat_completion, astream_chat_completion, chat_completion,
+)
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+_LLM_OPTIONS = {"model": "llama-3.1-8b-instant", "temperature": 0.7, "max_tokens": 180}
 
 
-def generate_cost_insights(db: Session, user_id: int):
-    """Generate AI-powered cost insights for a user."""
-    budget = db.query(Budget).filter(Budget.user_id == user_id).first()
-    subscriptions = db.query(Subscription).filter(Subscription.owner_id == user_id).all()
+def compute_cost_aggregates(db: Session, user_id: int) -> Optional[dict]:
+    """
+    Numeric part of the cost insights, or None if the user has no budget or subscriptions.
+    Spend by category comes from the user_category_totals rollup: one row per category.
+    """
+    monthly_limit = db.query(Budget.monthly_limit).filter(Budget.user_id == user_id).scalar()
 
-    if not budget or not subscriptions:
-        return {"error": "No budget or subscriptions found for this user."}
+    # Spend by category
+    totals = get_category_totals(db, user_id)
 
-    total_spent = sum([float(s.price) for s in subscriptions])
-    remaining = float(budget.monthly_limit) - total_spent
+    if monthly_limit is None or not totals:
+        return None
+
+    category_spend = {row.category: float(row.total_price) for row in totals}
+    total_spent = sum(category_spend.values())
+    remaining = float(monthly_limit) - total_spent
+
+    return {
+        "monthly_limit": float(monthly_limit),
+        "total_spent": total_spent,
+        "remaining": remaining,
+        "category_spend": category_spend,
+    }
 
-    # Spend by category
-    category_spend = {}
-    for s in subscriptions:
-        category_spend[s.category] = category_spend.get(s.category, 0.0) + float(s.price)
 
+def build_cost_messages(aggregates: dict) -> list[dict]:
     # Prepare text for LLM
     summary_text = (
-        f"Monthly limit: {budget.monthly_limit}. "
-        f"Total spent: {total_spent}. Remaining: {remaining}. "
-        f"Spending by category: {category_spend}."
+        f"Monthly limit: {aggregates['monthly_limit']}. "
+        f"Total spent: {aggregates['total_spent']}. Remaining: {aggregates['remaining']}. "
+        f"Spending by category: {aggregates['category_spend']}."
     )
 
     # 🔮 AI insight generation
@@ -42,19 +58,113 @@ def generate_cost_insights(db: Session, user_id: int):
     - Saving suggestions
     - Any pattern you observe
     """
+    return [{"role": "user", "content": prompt}]
+
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_tokens=180,
+def _degraded_insight(error: LLMUnavailable, aggregates: dict) -> Optional[str]:
+    if isinstance(error, LLMDeadlineExceeded):
+        # Overloaded: serve the numbers now rather than make the user wait
+        print(f"[Groq degraded] {error}")
+        return None
+    print(f"[Groq fallback error] {error}")
+    return _fallback_insight(
+        aggregates["monthly_limit"], aggregates["total_spent"],
+        aggregates["remaining"], aggregates["category_spend"],
     )
 
-    ai_message = response.choices[0].message.content.strip()
 
+def _build_response(aggregates: dict, ai_message: Optional[str]) -> dict:
     return {
-        "total_spent": total_spent,
-        "remaining": remaining,
-        "category_spend": category_spend,
+        "total_spent": aggregates["total_spent"],
+        "remaining": aggregates["remaining"],
+        "category_spend": aggregates["category_spend"],
         "ai_summary": ai_message,
     }
+
+
+def cost_insights_result(db: Session, user_id: int) -> tuple[dict, bool]:
+    """Cost insights plus whether they may be cached (False when the AI summary was degraded)."""
+    aggregates = compute_cost_aggregates(db, user_id)
+    if aggregates is None:
+        return {"error": "No budget or subscriptions found for this user."}, True
+
+    try:
+        ai_message = chat_completion(
+            build_cost_messages(aggregates),
+            deadline=settings.LLM_INTERACTIVE_DEADLINE_SECONDS,
+            **_LLM_OPTIONS,
+        )
+    except LLMUnavailable as e:
+        return _build_response(aggregates, _degraded_insight(e, aggregates)), False
+
+    return _build_response(aggregates, ai_message), True
+
+
+async def cost_insights_result_async(db: Session, user_id: int) -> tuple[dict, bool]:
+    """
+    Async variant of cost_insights_result: the queries run in the threadpool
+    and the completion on the async client, so no thread waits on the LLM.
+    """
+    aggregates = await run_in_threadpool(compute_cost_aggregates, db, user_id)
+    if aggregates is None:
+        return {"error": "No budget or subscriptions found for this user."}, True
+
+    try:
+        ai_message = await achat_completion(
+            build_cost_messages(aggregates),
+            deadline=settings.LLM_INTERACTIVE_DEADLINE_SECONDS,
+            **_LLM_OPTIONS,
+        )
+    except LLMUnavailable as e:
+        return _build_response(aggregates, _degraded_insight(e, aggregates)), False
+
+    return _build_response(aggregates, ai_message), True
+
+
+async def cost_insights_events(db: Session, user_id: int) -> AsyncIterator[tuple[str, Any]]:
+    """
+    Streaming variant: yields ("aggregates", numbers) as soon as the queries
+    finish, then ("token", text) per LLM delta, then ("result", (response, cacheable)).
+    """
+    aggregates = await run_in_threadpool(compute_cost_aggregates, db, user_id)
+    if aggregates is None:
+        yield "result", ({"error": "No budget or subscriptions found for this user."}, True)
+        return
+
+    yield "aggregates", _build_response(aggregates, None)
+
+    parts = []
+    try:
+        async for token in astream_chat_completion(
+            build_cost_messages(aggregates),
+            deadline=settings.LLM_INTERACTIVE_DEADLINE_SECONDS,
+            **_LLM_OPTIONS,
+        ):
+            parts.append(token)
+            yield "token", token
+    except LLMUnavailable as e:
+        yield "result", (_build_response(aggregates, _degraded_insight(e, aggregates)), False)
+        return
+
+    yield "result", (_build_response(aggregates, "".join(parts).strip()), True)
+
+
+def generate_cost_insights(db: Session, user_id: int):
+    """
+    Generate AI-powered cost insights for a user, from threadpool code. Shares
+    the cache and in-flight runs of GET /ai/cost-summary.
+    """
+    user = db.get(User, user_id)
+    if user is None:
+        return cost_insights_result(db, user_id)[0]
+    return get_ai_result("cost-summary", user, cost_insights_result)
+
+
+def _fallback_insight(monthly_limit: float, total_spent: float, remaining: float, category_spend: dict) -> str:
+    """Deterministic summary used when the LLM is unavailable."""
+    top_category = max(category_spend, key=category_spend.get) if category_spend else None
+    message = f"You have spent {total_spent:.2f} of your {monthly_limit:.2f} monthly limit"
+    message += f" ({remaining:.2f} remaining)." if remaining >= 0 else f" and are {-remaining:.2f} over budget."
+    if top_category:
+        message += f" Your largest category is {top_category} at {category_spend[top_category]:.2f}."
+    return message
@@ -1,49 +1,64 @@
 from datetime import datetime, timedelta
 from decimal import Decimal
+from typing import Any, AsyncIterator, Optional
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
-from groq import Groq
+from starlette.concurrency import run_in_threadpool
 from app.db.models import Subscription, User
+from app.services.ai_results import get_ai_result
+from app.core.admission import PRIORITY_INTERACTIVE
 from app.core.config import settings
+from app.core.llm_client import (
+    LLMDeadlineExceeded, LLMUnavailable, achat_completion, astream_chat_completion, chat_completion,
+)
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+_LLM_OPTIONS = {"model": "llama-3.1-8b-instant", "temperature": 0.7, "max_tokens": 220}
 
 
-def generate_monthly_report(db: Session, user_id: int):
-    """Generate an AI-driven monthly finance summary comparing current and previous months."""
-    
-    today = datetime.utcnow()
-    first_day = today.replace(day=1)
+def report_month(today: Optional[datetime] = None) -> str:
+    """Key of the reporting month, e.g. "2026-10"."""
+    return (today or datetime.utcnow()).strftime("%Y-%m")
+
+
+def month_windows(today: datetime):
+    """Start of this month, and start/end of the previous month (as dates, like renewal_date)."""
+    first_day = today.date().replace(day=1)
     last_month_end = first_day - timedelta(days=1)
     last_month_start = last_month_end.replace(day=1)
+    return first_day, last_month_start, last_month_end
 
-    # 🔹 Get current and previous month subscriptions
-    current_month_spend = db.query(Subscription).filter(
-        Subscription.owner_id == user_id,
-        Subscription.renewal_date >= first_day
-    ).all()
 
-    previous_month_spend = db.query(Subscription).filter(
-        Subscription.owner_id == user_id,
-        Subscription.renewal_date >= last_month_start,
-        Subscription.renewal_date <= last_month_end
-    ).all()
+def _category_sums(first_day, last_month_start, last_month_end):
+    """SUM(price) per category for this month and last month, via conditional aggregation."""
+    current = func.sum(case((Subscription.renewal_date >= first_day, Subscription.price)))
+    previous = func.sum(case(
+        (Subscription.renewal_date.between(last_month_start, last_month_end), Subscription.price)
+    ))
+    return current.label("current"), previous.label("previous")
 
-    # 🔹 Compute totals
-    total_spent = sum([float(sub.price) for sub in current_month_spend])
-    previous_spent = sum([float(sub.price) for sub in previous_month_spend])
-    change_percent = (
-        ((total_spent - previous_spent) / previous_spent * 100)
-        if previous_spent > 0 else 0
-    )
 
+def _summarize_months(today: datetime, category_rows, top_rows) -> dict:
+    """
+    Build the report numbers from (category, current, previous) sums, where a
+    NULL sum means no subscriptions in that month, and the top (name, category, price) rows.
+    """
     # 🔹 Category breakdowns
     category_spend_current = {}
     category_spend_previous = {}
 
-    for sub in current_month_spend:
-        category_spend_current[sub.category] = category_spend_current.get(sub.category, 0) + float(sub.price)
-    for sub in previous_month_spend:
-        category_spend_previous[sub.category] = category_spend_previous.get(sub.category, 0) + float(sub.price)
+    for category, current, previous in category_rows:
+        if current is not None:
+            category_spend_current[category] = float(current)
+        if previous is not None:
+            category_spend_previous[category] = float(previous)
+
+    # 🔹 Compute totals
+    total_spent = sum(category_spend_current.values())
+    previous_spent = sum(category_spend_previous.values())
+    change_percent = (
+        ((total_spent - previous_spent) / previous_spent * 100)
+        if previous_spent > 0 else 0
+    )
 
     # 🔹 Category growth analysis
     category_growth = {}
@@ -60,49 +75,197 @@ def generate_monthly_report(db: Session, user_id: int):
     )
 
     # 🔹 Top 3 subscriptions
-    top_subscriptions = sorted(
-        current_month_spend,
-        key=lambda s: float(s.price),
-        reverse=True
-    )[:3]
-
     top_subscriptions_list = [
-        {"name": sub.name, "category": sub.category, "price": float(sub.price)}
-        for sub in top_subscriptions
+        {"name": name, "category": category, "price": float(price)}
+        for name, category, price in top_rows
     ]
 
+    return {
+        "month": today.strftime("%B %Y"),
+        "total_spent": total_spent,
+        "previous_spent": previous_spent,
+        "change_percent": round(change_percent, 2),
+        "category_breakdown": category_spend_current,
+        "top_subscriptions": top_subscriptions_list,
+        "top_growth_category": top_growth_category,
+    }
+
+
+def compute_monthly_aggregates(db: Session, user_id: int) -> dict:
+    """
+    Numeric part of the monthly report: totals, breakdowns and top subscriptions.
+    Both months are summed per category in one query; only the top 3 rows are fetched.
+    """
+    today = datetime.utcnow()
+    first_day, last_month_start, last_month_end = month_windows(today)
+
+    category_rows = db.query(
+        Subscription.category, *_category_sums(first_day, last_month_start, last_month_end)
+    ).filter(
+        Subscription.owner_id == user_id,
+        Subscription.renewal_date >= last_month_start,
+    ).group_by(Subscription.category).all()
+
+    top_rows = db.query(Subscription.name, Subscription.category, Subscription.price).filter(
+        Subscription.owner_id == user_id,
+        Subscription.renewal_date >= first_day,
+    ).order_by(Subscription.price.desc(), Subscription.id).limit(3).all()
+
+    return _summarize_months(today, category_rows, top_rows)
+
+
+def compute_monthly_aggregates_many(db: Session, user_ids: list[int]) -> dict[int, dict]:
+    """
+    compute_monthly_aggregates for a batch of users with two queries in total, for batch jobs.
+    Users without subscriptions in either month still get an (empty) entry.
+    """
+    today = datetime.utcnow()
+    first_day, last_month_start, last_month_end = month_windows(today)
+
+    category_rows = db.query(
+        Subscription.owner_id, Subscription.category,
+        *_category_sums(first_day, last_month_start, last_month_end),
+    ).filter(
+        Subscription.owner_id.in_(user_ids),
+        Subscription.renewal_date >= last_month_start,
+    ).group_by(Subscription.owner_id, Subscription.category).all()
+
+    # Top 3 per user in SQL, ranked with a window function
+    rank = func.row_number().over(
+        partition_by=Subscription.owner_id,
+        order_by=(Subscription.price.desc(), Subscription.id),
+    ).label("rank")
+    ranked = db.query(
+        Subscription.owner_id, Subscription.name, Subscription.category, Subscription.price, rank,
+    ).filter(
+        Subscription.owner_id.in_(user_ids),
+        Subscription.renewal_date >= first_day,
+    ).subquery()
+    top_rows = db.query(ranked.c.owner_id, ranked.c.name, ranked.c.category, ranked.c.price).filter(
+        ranked.c.rank <= 3
+    ).order_by(ranked.c.owner_id, ranked.c.rank).all()
+
+    categories = {user_id: [] for user_id in user_ids}
+    tops = {user_id: [] for user_id in user_ids}
+    for owner_id, category, current, previous in category_rows:
+        categories[owner_id].append((category, current, previous))
+    for owner_id, name, category, price in top_rows:
+        tops[owner_id].append((name, category, price))
+
+    return {user_id: _summarize_months(today, categories[user_id], tops[user_id]) for user_id in user_ids}
+
+
+def build_monthly_messages(aggregates: dict) -> list[dict]:
     # 🔹 Prompt for AI summary
     prompt = f"""
     Generate a financial summary comparing this month to last month.
-    Current month total: ${total_spent:.2f}
-    Previous month total: ${previous_spent:.2f}
-    Change: {change_percent:.2f}%
-    Category breakdown: {category_spend_current}
-    Top 3 subscriptions: {top_subscriptions_list}
-    Category that increased most: {top_growth_category if top_growth_category else "None"}
+    Current month total: ${aggregates['total_spent']:.2f}
+    Previous month total: ${aggregates['previous_spent']:.2f}
+    Change: {aggregates['change_percent']:.2f}%
+    Category breakdown: {aggregates['category_breakdown']}
+    Top 3 subscriptions: {aggregates['top_subscriptions']}
+    Category that increased most: {aggregates['top_growth_category'] or "None"}
     Provide 3-5 concise sentences in friendly and analytical tone.
     """
+    return [
+        {"role": "system", "content": "You are a financial AI assistant that summarizes user spending patterns."},
+        {"role": "user", "content": prompt},
+    ]
+
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": "You are a financial AI assistant that summarizes user spending patterns."},
-            {"role": "user", "content": prompt},
-        ],
-        max_tokens=220,
-        temperature=0.7
+def _degraded_summary(error: LLMUnavailable, aggregates: dict) -> Optional[str]:
+    if isinstance(error, LLMDeadlineExceeded):
+        # Overloaded: serve the numbers now rather than make the user wait
+        print(f"[Groq degraded] {error}")
+        return None
+    print(f"[Groq fallback error] {error}")
+    return _fallback_summary(
+        aggregates["total_spent"], aggregates["previous_spent"],
+        aggregates["change_percent"], aggregates["top_growth_category"],
     )
 
-    ai_summary = response.choices[0].message.content.strip()
+
+def summarize_monthly_aggregates(
+    aggregates: dict,
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline: float | None = None,
+) -> tuple[dict, bool]:
+    """Add the AI summary to computed aggregates. Returns (report, cacheable)."""
+    try:
+        ai_summary = chat_completion(
+            build_monthly_messages(aggregates),
+            priority=priority,
+            deadline=deadline or settings.LLM_INTERACTIVE_DEADLINE_SECONDS,
+            **_LLM_OPTIONS,
+        )
+    except LLMUnavailable as e:
+        return {**aggregates, "ai_summary": _degraded_summary(e, aggregates)}, False
 
     # 🔹 Final output
-    return {
-        "month": today.strftime("%B %Y"),
-        "total_spent": total_spent,
-        "previous_spent": previous_spent,
-        "change_percent": round(change_percent, 2),
-        "category_breakdown": category_spend_current,
-        "top_subscriptions": top_subscriptions_list,
-        "top_growth_category": top_growth_category,
-        "ai_summary": ai_summary
-    }
+    return {**aggregates, "ai_summary": ai_summary}, True
+
+
+def monthly_report_result(db: Session, user_id: int) -> tuple[dict, bool]:
+    """Monthly report plus whether it may be cached (False when the AI summary was degraded)."""
+    return summarize_monthly_aggregates(compute_monthly_aggregates(db, user_id))
+
+
+async def monthly_report_result_async(db: Session, user_id: int) -> tuple[dict, bool]:
+    """Async variant of monthly_report_result for the event loop."""
+    aggregates = await run_in_threadpool(compute_monthly_aggregates, db, user_id)
+
+    try:
+        ai_summary = await achat_completion(
+            build_monthly_messages(aggregates),
+            deadline=settings.LLM_INTERACTIVE_DEADLINE_SECONDS,
+            **_LLM_OPTIONS,
+        )
+    except LLMUnavailable as e:
+        return {**aggregates, "ai_summary": _degraded_summary(e, aggregates)}, False
+
+    return {**aggregates, "ai_summary": ai_summary}, True
+
+
+async def monthly_report_events(db: Session, user_id: int) -> AsyncIterator[tuple[str, Any]]:
+    """
+    Streaming variant: yields ("aggregates", numbers) as soon as the queries
+    finish, then ("token", text) per LLM delta, then ("result", (response, cacheable)).
+    """
+    aggregates = await run_in_threadpool(compute_monthly_aggregates, db, user_id)
+    yield "aggregates", {**aggregates, "ai_summary": None}
+
+    parts = []
+    try:
+        async for token in astream_chat_completion(
+            build_monthly_messages(aggregates),
+            deadline=settings.LLM_INTERACTIVE_DEADLINE_SECONDS,
+            **_LLM_OPTIONS,
+        ):
+            parts.append(token)
+            yield "token", token
+    except LLMUnavailable as e:
+        yield "result", ({**aggregates, "ai_summary": _degraded_summary(e, aggregates)}, False)
+        return
+
+    yield "result", ({**aggregates, "ai_summary": "".join(parts).strip()}, True)
+
+
+def generate_monthly_report(db: Session, user_id: int):
+    """
+    Generate an AI-driven monthly finance summary comparing current and
+    previous months, from threadpool code. Shares the cache and in-flight
+    runs of GET /ai/monthly-report.
+    """
+    user = db.get(User, user_id)
+    if user is None:
+        return monthly_report_result(db, user_id)[0]
+    return get_ai_result("monthly-report", user, monthly_report_result, scope=report_month())
+
+
+def _fallback_summary(total_spent: float, previous_spent: float, change_percent: float, top_growth_category) -> str:
+    """Deterministic summary used when the LLM is unavailable."""
+    message = f"You spent ${total_spent:.2f} this month compared with ${previous_spent:.2f} last month"
+    message += f" ({change_percent:+.2f}%)." if previous_spent > 0 else "."
+    if top_growth_category:
+        message += f" {top_growth_category} grew the most."
+    return message
@@ -0,0 +1,116 @@
+# app/services/ai_results.py
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.response_cache import create_response_cache
+from app.core.single_flight import SingleFlight
+from app.db.database import SessionLocal
+from app.db.models import User
+
+# A result function returns (response, cacheable); degraded responses are not cached
+ResultFn = Callable[[Session, int], tuple[dict, bool]]
+AsyncResultFn = Callable[[Session, int], Awaitable[tuple[dict, bool]]]
+# An event function yields ("aggregates", dict), ("token", str)... and finally ("result", (response, cacheable))
+EventsFn = Callable[[Session, int], AsyncIterator[tuple[str, Any]]]
+
+# Identical concurrent AI requests (same endpoint, user and data version) share one computation
+ai_flights = SingleFlight()
+# Finished responses, reused until the user's data version changes
+ai_response_cache = create_response_cache()
+
+
+def _result_key(endpoint: str, user: User, scope: str) -> str:
+    # The version is part of the key, so a change never serves or joins a stale result
+    key = f"ai:{endpoint}:{user.id}:{user.data_version}"
+    return f"{key}:{scope}" if scope else key
+
+
+def _compute(key: str, fn: ResultFn, user_id: int) -> dict:
+    # The shared run opens its own session, since it may outlive the request that started it
+    db = SessionLocal()
+    try:
+        response, cacheable = fn(db, user_id)
+    finally:
+        db.close()
+    if cacheable:
+        ai_response_cache.set(key, response)
+    return response
+
+
+async def _compute_async(key: str, fn: AsyncResultFn, user_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        response, cacheable = await fn(db, user_id)
+    finally:
+        await run_in_threadpool(db.close)
+    if cacheable:
+        await ai_response_cache.aset(key, response)
+    return response
+
+
+def get_ai_result(endpoint: str, user: User, fn: ResultFn, scope: str = "") -> Any:
+    """
+    Return the AI response for `endpoint` from the cache, or run `fn(db, user_id)`
+    for threadpool callers, coalescing concurrent duplicates into one run.
+    `scope` narrows the key further, e.g. to the reporting month.
+    """
+    key = _result_key(endpoint, user, scope)
+    cached = ai_response_cache.get(key)
+    if cached is not None:
+        return cached
+    return ai_flights.do(key, _compute, key, fn, user.id)
+
+
+async def get_ai_result_async(endpoint: str, user: User, fn: AsyncResultFn, scope: str = "") -> Any:
+    """Async counterpart of get_ai_result for the event loop."""
+    key = _result_key(endpoint, user, scope)
+    cached = await ai_response_cache.aget(key)
+    if cached is not None:
+        return cached
+    return await ai_flights.do_async(key, _compute_async, key, fn, user.id)
+
+
+def format_sse(event: str, data: Any) -> str:
+    """One server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def replay_sse(response: dict) -> AsyncIterator[str]:
+    """A finished response as the aggregates + done events of a stream."""
+    if "error" not in response:
+        yield format_sse("aggregates", {**response, "ai_summary": None})
+    yield format_sse("done", response)
+
+
+async def stream_ai_result(endpoint: str, user: User, fn: EventsFn, scope: str = "") -> AsyncIterator[str]:
+    """
+    Server-sent events for an AI endpoint:
+      aggregates -> the numbers, sent as soon as the queries finish
+      token      -> {"text": ...} for each LLM delta
+      done       -> the full response, identical to the non-streaming endpoint
+
+    A cached response is replayed with replay_sse. Streams are not
+    coalesced, but a completed, non-degraded result is cached for later calls.
+    """
+    key = _result_key(endpoint, user, scope)
+    cached = await ai_response_cache.aget(key)
+    if cached is not None:
+        async for event in replay_sse(cached):
+            yield event
+        return
+
+    db = SessionLocal()
+    try:
+        async for event, data in fn(db, user.id):
+            if event == "token":
+                yield format_sse("token", {"text": data})
+            elif event == "result":
+                response, cacheable = data
+                if cacheable:
+                    await ai_response_cache.aset(key, response)
+                yield format_sse("done", response)
+            else:
+                yield format_sse(event, data)
+    finally:
+        await run_in_threadpool(db.close)
@@ -91,4 +91,15 @@ def get_current_user(
             detail="User not found",
         )
 
-    return user
\ No newline at end of file
+    return user
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Allow only users listed in ADMIN_EMAILS."""
+    admin_emails = {e.strip().lower() for e in settings.ADMIN_EMAILS.split(",") if e.strip()}
+    if current_user.email.lower() not in admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
@@ -0,0 +1,182 @@
+# app/services/budget_optimizer.py
+import asyncio
+import math
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Optional
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.models import Budget, Subscription
+from app.schemas.budget_schema import BudgetOptimizeRequest
+from app.services.forecast import monthly_equivalent
+
+# Solves are CPU-bound; a small dedicated pool keeps them from crowding out request threads
+_solver_pool = ThreadPoolExecutor(max_workers=settings.OPTIMIZER_WORKERS, thread_name_prefix="budget-optimizer")
+
+
+def solve_min_loss(savings: list[np.ndarray], losses: list[np.ndarray], need: int) -> Optional[list[int]]:
+    """
+    Multiple-choice knapsack: pick one option per item so total savings reach
+    `need` with the least total loss. Option 0 of every item must be "keep"
+    (saving 0, loss 0). Savings are integer steps.
+
+    dp[s] is the least loss that saves at least s steps; each option updates
+    the whole table with one shifted-slice comparison. Returns the chosen
+    option per item, or None if even the largest savings fall short of `need`.
+    """
+    # Quick exit before building the table
+    if sum(int(save.max()) for save in savings) < need:
+        return None
+
+    dp = np.full(need + 1, np.inf)
+    dp[0] = 0.0
+    choices = np.zeros((len(savings), need + 1), dtype=np.int8)
+    candidate = np.empty_like(dp)
+
+    for i, (save, loss) in enumerate(zip(savings, losses)):
+        best, pick = dp.copy(), choices[i]
+        for option in range(1, len(save)):
+            # Saving v steps reaches s from s - v; anything below v reaches it from 0
+            v = min(int(save[option]), need)
+            candidate[:v] = dp[0]
+            candidate[v:] = dp[:need + 1 - v]
+            candidate += loss[option]
+            better = candidate < best  # ties keep the earlier (smaller) change
+            pick[better] = option
+            np.minimum(best, candidate, out=best)
+        dp = best
+
+    chosen, s = [], need
+    for i in range(len(savings) - 1, -1, -1):
+        option = int(choices[i, s])
+        chosen.append(option)
+        s = max(0, s - int(savings[i][option]))
+    return chosen[::-1]
+
+
+def _to_cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+
+def load_optimizer_inputs(db: Session, user_id: int, request: BudgetOptimizeRequest) -> tuple[list, Decimal]:
+    """The user's subscriptions and the monthly target to optimize against."""
+    target = request.target_spend
+    if target is None:
+        target = db.query(Budget.monthly_limit).filter(Budget.user_id == user_id).scalar()
+        if target is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Budget not found; pass target_spend explicitly.",
+            )
+
+    rows = db.query(
+        Subscription.id, Subscription.name, Subscription.category, Subscription.price,
+        Subscription.billing_cycle, Subscription.billing_interval_days,
+    ).filter(Subscription.owner_id == user_id).order_by(Subscription.id).all()
+
+    if len(rows) > settings.OPTIMIZER_MAX_SUBSCRIPTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Too many subscriptions to optimize (max {settings.OPTIMIZER_MAX_SUBSCRIPTIONS}).",
+        )
+
+    owned = {row.id for row in rows}
+    unknown = sorted(
+        ({*request.keep} | {option.subscription_id for option in request.downgrades}) - owned
+    )
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown subscription ids: {unknown}",
+        )
+    return rows, Decimal(target)
+
+
+def plan_cancellations(rows: list, target: Decimal, request: BudgetOptimizeRequest) -> dict:
+    """
+    Choose which subscriptions to cancel or downgrade so monthly spend meets
+    `target` while losing the least value. A subscription's value is its
+    monthly cost times its category weight; a downgrade keeps
+    `value_retained` of it.
+    """
+    keep = set(request.keep)
+    downgrades = {option.subscription_id: option for option in request.downgrades}
+    costs = {row.id: monthly_equivalent(row.price, row.billing_cycle, row.billing_interval_days) for row in rows}
+    current = sum(costs.values())
+    # Per-row cents, so the savings below add up exactly to what the need counts
+    need_cents = sum(_to_cents(cost) for cost in costs.values()) - _to_cents(float(target))
+
+    result = {
+        "current_spend": round(current, 2),
+        "target_spend": float(target),
+        "feasible": True,
+        "projected_spend": round(current, 2),
+        "monthly_savings": 0.0,
+        "value_lost": 0.0,
+        "actions": [],
+    }
+    if need_cents <= 0:
+        return result
+
+    # Work in steps of at least one cent; savings round down and the need rounds up,
+    # so a coarser step can only over-save, never miss the target
+    step = max(1, math.ceil(need_cents / settings.OPTIMIZER_MAX_STEPS))
+    need = math.ceil(need_cents / step)
+
+    items, savings, losses = [], [], []
+    for row in rows:
+        if row.id in keep:
+            continue
+        cost = costs[row.id]
+        value = cost * request.category_weights.get(row.category, 1.0)
+        # (action, new monthly cost, value lost)
+        options = [("keep", cost, 0.0)]
+        option = downgrades.get(row.id)
+        if option is not None:
+            new_cost = monthly_equivalent(option.price, row.billing_cycle, row.billing_interval_days)
+            if new_cost < cost:
+                options.append(("downgrade", new_cost, value * (1 - option.value_retained)))
+        options.append(("cancel", 0.0, value))
+
+        items.append((row, options))
+        savings.append(np.array([(_to_cents(cost) - _to_cents(new)) // step for _, new, _ in options]))
+        losses.append(np.array([lost for _, _, lost in options]))
+
+    chosen = solve_min_loss(savings, losses, need) if items else None
+    if chosen is None:
+        # Out of reach: report the deepest cut available (cancel everything not kept)
+        result["feasible"] = False
+        chosen = [len(options) - 1 for _, options in items]
+
+    saved = lost = 0.0
+    for (row, options), index in zip(items, chosen):
+        action, new_cost, value_lost = options[index]
+        if action == "keep":
+            continue
+        cost = costs[row.id]
+        saved += cost - new_cost
+        lost += value_lost
+        result["actions"].append({
+            "subscription_id": row.id,
+            "name": row.name,
+            "category": row.category,
+            "action": action,
+            "monthly_cost": round(cost, 2),
+            "new_monthly_cost": round(new_cost, 2),
+            "monthly_savings": round(cost - new_cost, 2),
+        })
+
+    result["projected_spend"] = round(current - saved, 2)
+    result["monthly_savings"] = round(saved, 2)
+    result["value_lost"] = round(lost, 2)
+    return result
+
+
+async def optimize_budget(db: Session, user_id: int, request: BudgetOptimizeRequest) -> dict:
+    """Load in the threadpool, solve in the optimizer pool; the event loop only awaits."""
+    rows, target = await run_in_threadpool(load_optimizer_inputs, db, user_id, request)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_solver_pool, plan_cancellations, rows, target, request)
@@ -1,8 +1,12 @@
 # app/services/budget_service.py
 from fastapi import HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.db.models import Budget, User,Subscription
 from app.schemas.budget_schema import BudgetCreate, BudgetUpdate
+from app.services.data_version import bump_data_version
+from app.services.sync import record_tombstones
+from app.services.category_totals import clear_category_totals, get_category_totals
 from decimal import Decimal
 
 def create_budget(db: Session, user: User, budget_data: BudgetCreate):
@@ -23,7 +27,8 @@ def create_budget(db: Session, user: User, budget_data: BudgetCreate):
     new_budget = Budget(
         monthly_limit=budget_data.monthly_limit,
         current_spent=Decimal("0.00"),
-        user_id=user.id  # Use user_id directly instead of user relationship
+        user_id=user.id,  # Use user_id directly instead of user relationship
+        row_version=bump_data_version(db, user.id),
     )
 
     db.add(new_budget)
@@ -56,6 +61,7 @@ def update_budget(db: Session, user_id: int, budget_data: BudgetUpdate):
     for field, value in update_data.items():
         setattr(budget, field, value)
 
+    budget.row_version = bump_data_version(db, user_id)
     db.commit()
     db.refresh(budget)
     return budget
@@ -68,8 +74,14 @@ def delete_budget(db: Session, user_id: int):
     if not user or not user.budget:
         raise HTTPException(status_code=404, detail="Budget not found")
 
+    version = bump_data_version(db, user_id)
+    # Tombstones first, while the subscription rows still exist to select from
+    record_tombstones(db, user_id, "subscription", select(Subscription.id).where(Subscription.owner_id == user_id), version)
+    record_tombstones(db, user_id, "budget", [user.budget.id], version)
+
     # ✅ Delete all subscriptions for this user first
     db.query(Subscription).filter(Subscription.owner_id == user_id).delete()
+    clear_category_totals(db, user_id)
 
     # ✅ Then delete the budget itself
     db.delete(user.budget)
@@ -93,12 +105,19 @@ def get_budget_summary(db: Session, user_id: int):
     remaining = monthly_limit - current_spent   
     limit_exceeded = current_spent > monthly_limit
 
+    # One rollup row per category, maintained with every subscription write
+    category_breakdown = {
+        row.category: {"count": row.subscription_count, "total": row.total_price}
+        for row in get_category_totals(db, user_id)
+    }
+
     return {
         "monthly_limit": monthly_limit,
         "current_spent": current_spent,
         "remaining": max(remaining, Decimal("0.00")),
         "limit_exceeded": limit_exceeded,
         "allow_over_limit": budget.allow_over_limit,
+        "category_breakdown": category_breakdown,
         "status": ("Over Limit" if limit_exceeded else "Within Limit"),
         "insight": (
             "You have exceeded your monthly budget. Consider reviewing subscriptions."
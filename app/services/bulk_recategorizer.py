@@ -0,0 +1,146 @@
+# app/services/bulk_recategorizer.py
+import threading
+import uuid
+from datetime import datetime
+from sqlalchemy import case, func, update
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import Subscription
+from app.services.ai_categorizer import predict_categories
+from app.services.data_version import bump_data_version, owner_data_version
+from app.services.category_totals import rebuild_category_totals
+
+# Normalized service name used to deduplicate rows before prompting the LLM
+_normalized_name = func.lower(func.trim(Subscription.name))
+
+
+class RecategorizationJob:
+    """Progress of one bulk re-categorization run."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"  # queued | running | completed | failed
+        self.total_names = 0
+        self.processed_names = 0
+        self.updated_rows = 0
+        self.llm_calls = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total_names": self.total_names,
+            "processed_names": self.processed_names,
+            "progress_percent": round(self.processed_names / self.total_names * 100, 1) if self.total_names else 0.0,
+            "updated_rows": self.updated_rows,
+            "llm_calls": self.llm_calls,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_jobs: dict[str, RecategorizationJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def _apply_categories(db, mapping: dict[str, str]) -> int:
+    """Write categories for every "Other" row whose normalized name is in `mapping`, in one UPDATE."""
+    if not mapping:
+        return 0
+    affected = (Subscription.category == "Other", _normalized_name.in_(list(mapping)))
+    # Owners first: once updated, the rows no longer match "Other"
+    owner_ids = [owner_id for (owner_id,) in db.query(Subscription.owner_id).filter(*affected).distinct()]
+    bump_data_version(db, owner_ids)
+    result = db.execute(
+        update(Subscription)
+        .where(*affected)
+        .values(
+            category=case(mapping, value=_normalized_name, else_=Subscription.category),
+            category_status="resolved",
+            row_version=owner_data_version(Subscription.owner_id),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    # Rows move between categories in bulk; recount just the affected users
+    rebuild_category_totals(db, owner_ids)
+    db.commit()
+    return result.rowcount
+
+
+def run_recategorization(job: RecategorizationJob, chunk_size: int | None = None, prompt_batch_size: int | None = None):
+    """
+    Re-categorize every subscription stuck in "Other".
+
+    Distinct normalized names are read in keyset-paginated chunks, sent to the
+    LLM `prompt_batch_size` names per prompt, and written back with one bulk
+    UPDATE per chunk, so thousands of rows sharing a name cost one prompt slot.
+    """
+    chunk_size = chunk_size or settings.RECATEGORIZE_CHUNK_SIZE
+    prompt_batch_size = prompt_batch_size or settings.RECATEGORIZE_PROMPT_BATCH_SIZE
+
+    job.status = "running"
+    job.started_at = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        job.total_names = db.query(func.count(func.distinct(_normalized_name))).filter(
+            Subscription.category == "Other"
+        ).scalar() or 0
+
+        last_name = ""
+        while True:
+            chunk = (
+                db.query(_normalized_name, func.min(Subscription.description))
+                .filter(Subscription.category == "Other", _normalized_name > last_name)
+                .group_by(_normalized_name)
+                .order_by(_normalized_name)
+                .limit(chunk_size)
+                .all()
+            )
+            if not chunk:
+                break
+            last_name = chunk[-1][0]
+
+            mapping = {}
+            for i in range(0, len(chunk), prompt_batch_size):
+                batch = chunk[i:i + prompt_batch_size]
+                categories = predict_categories([(name, description) for name, description in batch])
+                job.llm_calls += 1
+                for (name, _), category in zip(batch, categories):
+                    if category and category.lower() != "other":
+                        mapping[name] = category
+
+            job.updated_rows += _apply_categories(db, mapping)
+            job.processed_names += len(chunk)
+            print(f"🏷️ Recategorization {job.id}: {job.processed_names}/{job.total_names} names, "
+                  f"{job.updated_rows} rows updated")
+
+        job.status = "completed"
+    except Exception as e:
+        db.rollback()
+        job.status = "failed"
+        job.error = str(e)
+        print(f"❌ Recategorization {job.id} failed: {e}")
+    finally:
+        job.finished_at = datetime.utcnow()
+        db.close()
+
+
+def start_recategorization() -> RecategorizationJob:
+    """Start a bulk re-categorization in a background thread, unless one is already running."""
+    with _jobs_lock:
+        for job in _jobs.values():
+            if job.status in ("queued", "running"):
+                return job
+        job = RecategorizationJob()
+        _jobs[job.id] = job
+
+    threading.Thread(target=run_recategorization, args=(job,), name=f"recategorize-{job.id[:8]}", daemon=True).start()
+    return job
+
+
+def get_recategorization_job(job_id: str) -> RecategorizationJob | None:
+    return _jobs.get(job_id)
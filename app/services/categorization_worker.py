@@ -0,0 +1,167 @@
+# app/services/categorization_worker.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import update
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import Subscription
+from app.services.data_version import bump_data_version, owner_data_version
+from app.services.category_totals import move_category_total
+from app.services.ai_categorizer import predict_categories_cached, predict_category
+
+# Dedicated threads so LLM calls never occupy the request threadpool
+_executor = ThreadPoolExecutor(
+    max_workers=settings.CATEGORIZATION_WORKERS,
+    thread_name_prefix="categorizer",
+)
+
+# Subscription ids queued or being resolved, so the sweep does not double-queue them
+_in_flight: set[int] = set()
+_in_flight_lock = threading.Lock()
+
+
+def _store_category(db, sub_id: int, row, category: str) -> bool:
+    """
+    Write the LLM's category for a pending row read as `row`. The caller commits.
+
+    The UPDATE only applies while the row is still pending, so a category the
+    user set in the meantime is never overwritten.
+    """
+    values = {"category_status": "resolved"}
+    # "Other" is also the LLM error fallback; keep the provisional keyword category then
+    if category != "Other":
+        values["category"] = category
+
+    # Bump first: the user-row lock orders this change with the owner's others
+    bump_data_version(db, row.owner_id)
+    # The category must still be the one read, so the rollup moves the right
+    # row; if the user changed it meanwhile the row stays pending for the next sweep
+    result = db.execute(
+        update(Subscription)
+        .where(
+            Subscription.id == sub_id,
+            Subscription.category_status == "pending",
+            Subscription.category == row.category,
+        )
+        .values(**values, row_version=owner_data_version(Subscription.owner_id))
+    )
+    if result.rowcount and values.get("category", row.category) != row.category:
+        # The UPDATE holds the row lock, so this price is the one being moved
+        price = db.query(Subscription.price).filter(Subscription.id == sub_id).scalar()
+        move_category_total(db, row.owner_id, row.category, price, values["category"], price)
+    return result.rowcount > 0
+
+
+def _pending_rows(db, sub_ids: list[int]):
+    return db.query(
+        Subscription.id, Subscription.name, Subscription.description, Subscription.owner_id, Subscription.category,
+    ).filter(
+        Subscription.id.in_(sub_ids),
+        Subscription.category_status == "pending",
+    ).all()
+
+
+def resolve_category(sub_id: int) -> bool:
+    """
+    Ask the LLM for the final category of a pending subscription and store it.
+    Returns True if the row was updated.
+    """
+    db = SessionLocal()
+    try:
+        rows = _pending_rows(db, [sub_id])
+        if not rows:
+            return False
+        updated = _store_category(db, sub_id, rows[0], predict_category(rows[0].name, rows[0].description))
+        db.commit()
+        return updated
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Categorization failed for subscription {sub_id}: {e}")
+        return False
+    finally:
+        db.close()
+
+
+def resolve_categories(sub_ids: list[int]) -> int:
+    """
+    resolve_category for many rows at once: services the cache does not
+    know share one LLM prompt. Returns how many rows were updated.
+    """
+    db = SessionLocal()
+    try:
+        rows = _pending_rows(db, sub_ids)
+        categories = predict_categories_cached([(row.name, row.description) for row in rows])
+        updated = sum(_store_category(db, row.id, row, category) for row, category in zip(rows, categories))
+        db.commit()
+        return updated
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Batch categorization failed for {len(sub_ids)} subscriptions: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def _run(sub_id: int):
+    try:
+        resolve_category(sub_id)
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(sub_id)
+
+
+def schedule_categorization(sub_id: int):
+    """Queue a subscription for background categorization."""
+    with _in_flight_lock:
+        if sub_id in _in_flight:
+            return
+        _in_flight.add(sub_id)
+    _executor.submit(_run, sub_id)
+
+
+def _run_batch(sub_ids: list[int]):
+    try:
+        resolve_categories(sub_ids)
+    finally:
+        with _in_flight_lock:
+            _in_flight.difference_update(sub_ids)
+
+
+def schedule_categorization_batch(sub_ids: list[int]):
+    """
+    Queue many subscriptions for background categorization, one LLM prompt
+    per RECATEGORIZE_PROMPT_BATCH_SIZE rows instead of one per row.
+    """
+    with _in_flight_lock:
+        sub_ids = [sub_id for sub_id in sub_ids if sub_id not in _in_flight]
+        _in_flight.update(sub_ids)
+    size = settings.RECATEGORIZE_PROMPT_BATCH_SIZE
+    for i in range(0, len(sub_ids), size):
+        _executor.submit(_run_batch, sub_ids[i:i + size])
+
+
+def resolve_pending_categories(limit: int | None = None) -> int:
+    """
+    Queue up to `limit` subscriptions still marked pending, e.g. rows left
+    behind by a restart. Returns how many were queued.
+    """
+    limit = limit or settings.CATEGORIZATION_SWEEP_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        ids = [
+            sub_id for (sub_id,) in db.query(Subscription.id)
+            .filter(Subscription.category_status == "pending")
+            .order_by(Subscription.id)
+            .limit(limit)
+        ]
+    finally:
+        db.close()
+
+    for sub_id in ids:
+        schedule_categorization(sub_id)
+    return len(ids)
+
+
+def shutdown_categorization_worker():
+    """Stop the worker. Rows still pending are picked up by the next sweep."""
+    _executor.shutdown(wait=False, cancel_futures=True)
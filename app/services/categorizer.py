@@ -1,5 +1,6 @@
 # app/services/categorizer_service.py
-from typing import Optional
+import re
+from typing import Iterable, Optional, Tuple, Union
 
 # Predefined keyword-based domain mapping
 CATEGORY_KEYWORDS = {
@@ -45,16 +46,92 @@ CATEGORY_KEYWORDS = {
 }
 
 
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Compile keywords into one regex shaped like a trie, e.g.
+    ["notion", "notion ai", "netflix"] -> "n(?:etflix|otion(?:\\ ai)?)".
+    Each start position is then matched in a single pass over shared prefixes
+    instead of retrying every keyword.
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end-of-keyword marker
+
+    def emit(node: dict) -> str:
+        ends_here = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            # Greedy optional: prefer the longer keyword, fall back to this one
+            body = body + "?" if len(branches) == 1 and len(branches[0]) == 1 else "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Multi-pattern keyword matcher compiled once from a {category: [keywords]} table.
+
+    Keywords only match on word boundaries, so "vi" no longer fires inside
+    "video" or "sim" inside "simply". When several keywords match, the longest
+    one wins ("notion ai" beats "notion"); ties go to the category listed first.
+    """
+
+    def __init__(self, keyword_map: dict[str, list[str]], default: str = "Other"):
+        self.default = default
+        self._keywords: dict[str, tuple[int, int]] = {}  # keyword -> (length, -category rank)
+        self._categories: dict[str, str] = {}
+        for rank, (category, keywords) in enumerate(keyword_map.items()):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword not in self._categories:
+                    self._categories[keyword] = category
+                    self._keywords[keyword] = (len(keyword), -rank)
+
+        # Leading \W (instead of a lookbehind) lets the regex engine skip ahead
+        # to separator characters; match() pads the text with a space for it
+        self._pattern = re.compile(
+            r"\W(" + _trie_pattern(self._keywords) + r")(?!\w)"
+        ) if self._keywords else None
+        self._priority = self._keywords.__getitem__
+
+    def match(self, text: str) -> str:
+        """Return the best category for `text`, or the default if nothing matches."""
+        if self._pattern is None:
+            return self.default
+        found = self._pattern.findall(" " + text.lower())
+        if not found:
+            return self.default
+        return self._categories[max(found, key=self._priority)]
+
+    def match_many(self, texts: Iterable[str]) -> list[str]:
+        match = self.match
+        return [match(text) for text in texts]
+
+
+_matcher = KeywordMatcher(CATEGORY_KEYWORDS)
+
+
 def categorize_service(name: str, description: Optional[str] = None) -> str:
     """
     Determine a category for a given service name/description.
     Returns 'Other' if no keywords match.
     """
-    text = f"{name} {description or ''}".lower()
+    return _matcher.match(f"{name} {description or ''}")
 
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text:
-                return category
 
-    return "Other"
+def categorize_many(items: Iterable[Union[str, Tuple[str, Optional[str]]]]) -> list[str]:
+    """
+    Categorize many services at once. Each item is a name or a
+    (name, description) pair. Returns one category per item, in order.
+    """
+    return _matcher.match_many(
+        item if isinstance(item, str) else f"{item[0]} {item[1] or ''}"
+        for item in items
+    )
@@ -0,0 +1,200 @@
+# app/services/category_cache.py
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.database import SessionLocal, dialect_insert
+from app.db.models import ServiceCatalog
+
+
+def normalize_service_key(name: str, description: Optional[str] = None) -> str:
+    """Case- and whitespace-insensitive key for a service name and description."""
+    def norm(text: Optional[str]) -> str:
+        return " ".join((text or "").lower().split())
+    return f"{norm(name)}|{norm(description)}"
+
+
+class CategoryCache:
+    """
+    Tiered lookup for LLM categories:
+    in-process LRU -> shared service_catalog table -> LLM (only on a miss in both).
+
+    Catalog rows older than `catalog_ttl` count as misses and are refreshed.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, catalog_ttl: timedelta):
+        self.lru = LRUCache(max_entries, ttl_seconds)
+        self.catalog_ttl = catalog_ttl
+        self._lock = threading.Lock()
+        self._counters = {"lru_hits": 0, "catalog_hits": 0, "misses": 0, "catalog_errors": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _read_catalog(self, key: str) -> Optional[str]:
+        return self._read_catalog_many([key]).get(key)
+
+    def _read_catalog_many(self, keys: list[str]) -> dict[str, str]:
+        """Fresh catalog categories for `keys`, in one query."""
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                ServiceCatalog.normalized_key, ServiceCatalog.category, ServiceCatalog.updated_at
+            ).filter(ServiceCatalog.normalized_key.in_(keys)).all()
+        finally:
+            db.close()
+        fresh_after = datetime.utcnow() - self.catalog_ttl
+        return {row.normalized_key: row.category for row in rows if row.updated_at >= fresh_after}
+
+    def _write_catalog(self, key: str, name: str, category: str):
+        self._write_catalog_many([(key, name, category)])
+
+    def _write_catalog_many(self, entries: list[tuple[str, str, str]]):
+        """Upsert (key, name, category) rows in one statement; keys must be distinct."""
+        db = SessionLocal()
+        try:
+            upsert = dialect_insert(db)
+            now = datetime.utcnow()
+            stmt = upsert(ServiceCatalog).values([
+                {"normalized_key": key, "name": name, "category": category, "source": "llm", "updated_at": now}
+                for key, name, category in entries
+            ])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[ServiceCatalog.normalized_key],
+                set_={"category": stmt.excluded.category, "updated_at": stmt.excluded.updated_at},
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def get_or_compute(
+        self,
+        name: str,
+        description: Optional[str],
+        compute: Callable[[str, Optional[str]], str],
+        cacheable: Callable[[str], bool] = lambda category: True,
+    ) -> str:
+        """
+        Return the cached category, calling `compute` only on a miss in both
+        tiers. Results rejected by `cacheable` (e.g. error fallbacks) are not stored.
+        """
+        key = normalize_service_key(name, description)
+
+        category = self.lru.get(key)
+        if category is not None:
+            self._count("lru_hits")
+            return category
+
+        try:
+            category = self._read_catalog(key)
+        except Exception as e:
+            # The catalog is an optimization; never fail categorization because of it
+            self._count("catalog_errors")
+            print(f"⚠️ Service catalog read failed: {e}")
+            category = None
+        if category is not None:
+            self._count("catalog_hits")
+            self.lru.set(key, category)
+            return category
+
+        self._count("misses")
+        category = compute(name, description)
+        if cacheable(category):
+            self.lru.set(key, category)
+            try:
+                self._write_catalog(key, name, category)
+            except Exception as e:
+                self._count("catalog_errors")
+                print(f"⚠️ Service catalog write failed: {e}")
+        return category
+
+    def get_or_compute_many(
+        self,
+        items: Iterable[tuple[str, Optional[str]]],
+        compute_many: Callable[[list[tuple[str, Optional[str]]]], list[str]],
+        cacheable: Callable[[str], bool] = lambda category: True,
+    ) -> list[str]:
+        """
+        Batch form of get_or_compute for (name, description) pairs: one
+        catalog query for the LRU misses and a single `compute_many` call
+        for what neither tier knows. Duplicate services are looked up once.
+        """
+        items = list(items)
+        keys = [normalize_service_key(name, description) for name, description in items]
+        first_item = {}
+        for key, item in zip(keys, items):
+            first_item.setdefault(key, item)
+
+        found = {}
+        for key in first_item:
+            category = self.lru.get(key)
+            if category is not None:
+                self._count("lru_hits")
+                found[key] = category
+
+        missing = [key for key in first_item if key not in found]
+        if missing:
+            try:
+                catalog = self._read_catalog_many(missing)
+            except Exception as e:
+                self._count("catalog_errors")
+                print(f"⚠️ Service catalog read failed: {e}")
+                catalog = {}
+            for key, category in catalog.items():
+                self._count("catalog_hits")
+                self.lru.set(key, category)
+                found[key] = category
+
+        to_compute = [key for key in missing if key not in found]
+        if to_compute:
+            with self._lock:
+                self._counters["misses"] += len(to_compute)
+            computed = compute_many([first_item[key] for key in to_compute])
+            entries = []
+            for key, category in zip(to_compute, computed):
+                found[key] = category
+                if cacheable(category):
+                    self.lru.set(key, category)
+                    entries.append((key, first_item[key][0], category))
+            if entries:
+                try:
+                    self._write_catalog_many(entries)
+                except Exception as e:
+                    self._count("catalog_errors")
+                    print(f"⚠️ Service catalog write failed: {e}")
+        return [found[key] for key in keys]
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["lru_hits"] + counters["catalog_hits"] + counters["misses"]
+        return {
+            **counters,
+            "lookups": lookups,
+            "hit_rate": round((lookups - counters["misses"]) / lookups, 4) if lookups else 0.0,
+            "lru_size": len(self.lru),
+            "lru_evictions": self.lru.evictions,
+        }
+
+
+category_cache = CategoryCache(
+    max_entries=settings.CATEGORY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CATEGORY_CACHE_TTL_SECONDS,
+    catalog_ttl=timedelta(days=settings.CATEGORY_CATALOG_TTL_DAYS),
+)
+
+
+def purge_expired_catalog_entries() -> int:
+    """Delete service_catalog rows past their TTL. Returns rows removed."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.CATEGORY_CATALOG_TTL_DAYS)
+    db = SessionLocal()
+    try:
+        removed = db.query(ServiceCatalog).filter(ServiceCatalog.updated_at < cutoff).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        return removed
+    finally:
+        db.close()
@@ -0,0 +1,108 @@
+# app/services/category_totals.py
+from decimal import Decimal
+from typing import Iterable, Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal, dialect_insert
+from app.db.models import Subscription, UserCategoryTotal
+
+
+def _cents(value) -> Decimal:
+    # Match the Numeric(10, 2) rounding applied to subscriptions.price
+    return Decimal(str(value)).quantize(Decimal("0.01"))
+
+
+def adjust_category_total(db: Session, user_id: int, category: str, count_delta: int, amount_delta: Decimal):
+    """
+    Add `count_delta` subscriptions and `amount_delta` spend to one rollup row,
+    creating it if needed and dropping it once empty. The caller commits, so
+    this lands in the same transaction as the subscription change.
+    """
+    upsert = dialect_insert(db)
+    stmt = upsert(UserCategoryTotal).values(
+        user_id=user_id, category=category,
+        subscription_count=count_delta, total_price=_cents(amount_delta),
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserCategoryTotal.user_id, UserCategoryTotal.category],
+        set_={
+            "subscription_count": UserCategoryTotal.subscription_count + stmt.excluded.subscription_count,
+            "total_price": UserCategoryTotal.total_price + stmt.excluded.total_price,
+        },
+    ))
+    if count_delta < 0:
+        db.execute(delete(UserCategoryTotal).where(
+            UserCategoryTotal.user_id == user_id,
+            UserCategoryTotal.category == category,
+            UserCategoryTotal.subscription_count <= 0,
+        ))
+
+
+def move_category_total(
+    db: Session, user_id: int,
+    old_category: str, old_price: Decimal,
+    new_category: str, new_price: Decimal,
+):
+    """Reflect a subscription's category and/or price change in the rollup."""
+    old_price, new_price = _cents(old_price), _cents(new_price)
+    if old_category == new_category:
+        if old_price != new_price:
+            adjust_category_total(db, user_id, new_category, 0, new_price - old_price)
+        return
+    adjust_category_total(db, user_id, old_category, -1, -old_price)
+    adjust_category_total(db, user_id, new_category, 1, new_price)
+
+
+def clear_category_totals(db: Session, user_id: int):
+    db.execute(delete(UserCategoryTotal).where(UserCategoryTotal.user_id == user_id))
+
+
+def get_category_totals(db: Session, user_id: int) -> list[UserCategoryTotal]:
+    """The user's rollup rows: one per category, however many subscriptions they have."""
+    return db.query(UserCategoryTotal).filter(UserCategoryTotal.user_id == user_id).all()
+
+
+def rebuild_category_totals(db: Session, user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute rollup rows from the subscriptions table, for the given users or
+    for everyone, replacing whatever was there (repairs drift). The caller
+    commits. Returns the number of rollup rows written.
+    """
+    source = select(
+        Subscription.owner_id,
+        Subscription.category,
+        func.count(),
+        func.coalesce(func.sum(Subscription.price), 0),
+    ).where(Subscription.owner_id.is_not(None)).group_by(Subscription.owner_id, Subscription.category)
+    clear = delete(UserCategoryTotal)
+
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        source = source.where(Subscription.owner_id.in_(user_ids))
+        clear = clear.where(UserCategoryTotal.user_id.in_(user_ids))
+
+    db.execute(clear)
+    result = db.execute(
+        insert(UserCategoryTotal).from_select(
+            ["user_id", "category", "subscription_count", "total_price"], source
+        )
+    )
+    return result.rowcount
+
+
+def backfill_category_totals() -> int:
+    """
+    Build the rollup once for databases created before it existed: rebuilds
+    only if the table is empty while subscriptions exist. Returns rows written.
+    """
+    db = SessionLocal()
+    try:
+        if db.query(UserCategoryTotal.user_id).first() or not db.query(Subscription.id).first():
+            return 0
+        rows = rebuild_category_totals(db)
+        db.commit()
+        return rows
+    finally:
+        db.close()
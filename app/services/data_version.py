@@ -0,0 +1,45 @@
+# app/services/data_version.py
+from typing import Iterable, Optional, Union
+from sqlalchemy import Select, select, update
+from sqlalchemy.orm import Session
+from app.db.models import User
+
+
+def bump_data_version(db: Session, user_ids: Union[int, Iterable[int], Select]) -> Optional[int]:
+    """
+    Increment users.data_version for the given user id(s) or a SELECT of ids.
+
+    Call it in the same transaction as the change to the user's subscriptions
+    or budget, before the change itself; the caller commits. Derived results
+    (coalesced or cached AI reports) are keyed on this version, so they never
+    outlive the data.
+
+    The UPDATE locks the user row until commit, so a user's versions commit
+    in order; changed rows are stamped with the new version (row_version)
+    for /sync. For a single id the new version is returned.
+    """
+    if isinstance(user_ids, int):
+        return db.execute(
+            update(User)
+            .where(User.id == user_ids)
+            .values(data_version=User.data_version + 1)
+            .returning(User.data_version)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+    if not isinstance(user_ids, Select):
+        user_ids = list(user_ids)
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return None
+
+
+def owner_data_version(owner_id_column):
+    """
+    The owner's current data_version as a scalar subquery, for stamping
+    row_version in bulk UPDATEs that follow bump_data_version.
+    """
+    return select(User.data_version).where(User.id == owner_id_column).scalar_subquery()
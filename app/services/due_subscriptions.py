@@ -1,8 +1,23 @@
 # app/services/due_subscriptions.py
 
 from datetime import date, timedelta
+from itertools import groupby
+from operator import itemgetter
 from sqlalchemy.orm import Session
-from app.db.models import Subscription
+from app.db.models import Subscription, User
+
+# Rows fetched per round trip when streaming the global due scan
+DUE_SCAN_CHUNK_SIZE = 1000
+
+
+def build_sub_info(name: str, renewal: date, price, category: str) -> dict:
+    """Shape a single subscription entry for reminder payloads."""
+    return {
+        "name": name,
+        "renewal_date": renewal.strftime("%Y-%m-%d"),
+        "price": float(price),
+        "category": category,
+    }
 
 
 def get_due_subscriptions(db: Session, user_id: int) -> dict:
@@ -37,12 +52,7 @@ def get_due_subscriptions(db: Session, user_id: int) -> dict:
         except Exception:
             continue  # Skip malformed dates safely
 
-        sub_info = {
-            "name": sub.name,
-            "renewal_date": renewal.strftime("%Y-%m-%d"),
-            "price": float(sub.price),
-            "category": sub.category,
-        }
+        sub_info = build_sub_info(sub.name, renewal, sub.price, sub.category)
 
         if today <= renewal <= upcoming_threshold:
             due_soon.append(sub_info)
@@ -50,3 +60,48 @@ def get_due_subscriptions(db: Session, user_id: int) -> dict:
             overdue.append(sub_info)
 
     return {"due_soon": due_soon, "overdue": overdue}
+
+
+def iter_due_subscriptions_by_owner(
+    db: Session,
+    window_days: int = 7,
+    chunk_size: int = DUE_SCAN_CHUNK_SIZE,
+):
+    """
+    Stream due-soon and overdue subscriptions for every user in a single query.
+
+    Only rows with renewal_date <= today + window_days are read, joined to
+    the owner's email and ordered by owner, so results can be grouped on the
+    fly. Rows come back as plain column tuples through a server-side cursor,
+    keeping memory flat regardless of table size.
+
+    Yields:
+        (owner_id, email, {"due_soon": [...], "overdue": [...]})
+    """
+    today = date.today()
+    upcoming_threshold = today + timedelta(days=window_days)
+
+    rows = (
+        db.query(
+            Subscription.owner_id,
+            User.email,
+            Subscription.name,
+            Subscription.renewal_date,
+            Subscription.price,
+            Subscription.category,
+        )
+        .join(User, User.id == Subscription.owner_id)
+        .filter(Subscription.renewal_date <= upcoming_threshold)
+        .order_by(Subscription.owner_id, Subscription.renewal_date)
+        .yield_per(chunk_size)
+    )
+
+    for (owner_id, email), group in groupby(rows, key=itemgetter(0, 1)):
+        due_soon, overdue = [], []
+        for _, _, name, renewal, price, category in group:
+            sub_info = build_sub_info(name, renewal, price, category)
+            if renewal < today:
+                overdue.append(sub_info)
+            else:
+                due_soon.append(sub_info)
+        yield owner_id, email, {"due_soon": due_soon, "overdue": overdue}
@@ -1,12 +1,12 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings
+from app.services.smtp_dispatcher import open_smtp_connection
 
-def send_due_reminder(recipient_email: str, result: dict):
-    """Send an email reminder listing due and overdue subscriptions."""
+
+def build_due_reminder(recipient_email: str, result: dict) -> MIMEMultipart:
+    """Build the reminder email listing due and overdue subscriptions."""
     sender_email = settings.SMTP_EMAIL
-    sender_pass = settings.SMTP_PASSWORD
 
     subject = "🔔 Spendly – Upcoming & Overdue Subscriptions"
 
@@ -34,11 +34,27 @@ Keep track and avoid surprise renewals 💸
     msg["To"] = recipient_email
     msg["Subject"] = subject
     msg.attach(MIMEText(body, "plain"))
+    return msg
+
+
+def send_due_reminder(recipient_email: str, result: dict):
+    """
+    Send an email reminder listing due and overdue subscriptions.
+
+    Opens a dedicated SMTP session for this one message. Batch jobs should
+    use `SMTPDispatcher` from app.services.smtp_dispatcher instead.
+    """
+    msg = build_due_reminder(recipient_email, result)
 
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(sender_email, sender_pass)
+        with open_smtp_connection(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.SMTP_EMAIL,
+            settings.SMTP_PASSWORD,
+            use_tls=settings.SMTP_USE_TLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+        ) as server:
             server.send_message(msg)
         print(f"✅ Reminder email sent to {recipient_email}")
     except Exception as e:
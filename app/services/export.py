@@ -0,0 +1,115 @@
+# app/services/export.py
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator, Literal, Optional
+from sqlalchemy import Select, select
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import SpendLedgerEntry, Subscription
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+SUBSCRIPTION_COLUMNS = (
+    Subscription.id, Subscription.name, Subscription.description, Subscription.price,
+    Subscription.renewal_date, Subscription.category, Subscription.category_status,
+    Subscription.billing_cycle, Subscription.billing_interval_days,
+)
+LEDGER_COLUMNS = (
+    SpendLedgerEntry.id, SpendLedgerEntry.subscription_id, SpendLedgerEntry.name,
+    SpendLedgerEntry.category, SpendLedgerEntry.amount, SpendLedgerEntry.charged_on,
+    SpendLedgerEntry.recorded_at,
+)
+
+
+def subscription_export_query(
+    user_id: int,
+    category: Optional[str] = None,
+    renewal_from: Optional[date] = None,
+    renewal_to: Optional[date] = None,
+) -> Select:
+    stmt = select(*SUBSCRIPTION_COLUMNS).where(Subscription.owner_id == user_id)
+    if category:
+        stmt = stmt.where(Subscription.category == category)
+    if renewal_from:
+        stmt = stmt.where(Subscription.renewal_date >= renewal_from)
+    if renewal_to:
+        stmt = stmt.where(Subscription.renewal_date <= renewal_to)
+    return stmt.order_by(Subscription.id)
+
+
+def ledger_export_query(
+    user_id: int,
+    category: Optional[str] = None,
+    charged_from: Optional[date] = None,
+    charged_to: Optional[date] = None,
+) -> Select:
+    # Served by ix_spend_ledger_user_charged_on
+    stmt = select(*LEDGER_COLUMNS).where(SpendLedgerEntry.user_id == user_id)
+    if category:
+        stmt = stmt.where(SpendLedgerEntry.category == category)
+    if charged_from:
+        stmt = stmt.where(SpendLedgerEntry.charged_on >= charged_from)
+    if charged_to:
+        stmt = stmt.where(SpendLedgerEntry.charged_on <= charged_to)
+    return stmt.order_by(SpendLedgerEntry.charged_on, SpendLedgerEntry.id)
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _stream_rows(stmt: Select) -> Iterator[tuple]:
+    """
+    Rows of `stmt` through a server-side cursor, EXPORT_FETCH_ROWS at a time.
+
+    Uses its own session: the request's get_db session is closed before a
+    streaming body is sent.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_FETCH_ROWS))
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        db.close()
+
+
+def stream_export(stmt: Select, fmt: ExportFormat) -> Iterator[bytes]:
+    """
+    Encode the rows of `stmt` as CSV (with a header row) or NDJSON, yielding
+    ~EXPORT_CHUNK_BYTES chunks, so memory stays flat however many rows there are.
+    """
+    columns = [column["name"] for column in stmt.column_descriptions]
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        write = writer.writerow
+    else:
+        encode = json.JSONEncoder(separators=(",", ":")).encode
+
+        def write(row):
+            buffer.write(encode({name: _json_value(value) for name, value in zip(columns, row)}))
+            buffer.write("\n")
+
+    for row in _stream_rows(stmt):
+        write(row)
+        if buffer.tell() >= settings.EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_filename(dataset: str, fmt: ExportFormat) -> str:
+    return f"{dataset}-{date.today().isoformat()}.{fmt}"
@@ -0,0 +1,182 @@
+# app/services/forecast.py
+from datetime import date
+from typing import Iterable, Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import Subscription
+from app.services.spend_ledger import DEFAULT_INTERVAL_DAYS, add_months, month_start
+
+CYCLE_CODES = {"weekly": 0, "monthly": 1, "yearly": 2, "custom": 3}
+WEEKLY, MONTHLY, YEARLY, CUSTOM = 0, 1, 2, 3
+# Average month length, for converting weekly/custom cycles to a monthly cost
+DAYS_PER_MONTH = 365.25 / 12
+
+
+def monthly_equivalent(price, cycle: str, interval_days: Optional[int] = None) -> float:
+    """Average monthly cost of a subscription billed `price` per cycle."""
+    price = float(price)
+    if cycle == "yearly":
+        return price / 12
+    if cycle == "weekly":
+        return price * DAYS_PER_MONTH / 7
+    if cycle == "custom":
+        return price * DAYS_PER_MONTH / (interval_days or DEFAULT_INTERVAL_DAYS)
+    return price
+
+
+def month_boundaries(today: date, months: int) -> np.ndarray:
+    """First day of this month and of each of the next `months` months, as datetime64[D]."""
+    start = month_start(today)
+    return np.array([add_months(start, i) for i in range(months + 1)], dtype="datetime64[D]")
+
+
+def project_charges(
+    anchors: np.ndarray,
+    prices: np.ndarray,
+    cycles: np.ndarray,
+    intervals: np.ndarray,
+    today: date,
+    months: int,
+) -> np.ndarray:
+    """
+    Expand subscriptions into projected spend per calendar month.
+
+    `anchors` are the next renewal dates (datetime64[D]); charges repeat from
+    there by cycle. Only charges from `today` onward count, so an overdue
+    anchor still projects its later renewals. Monthly and yearly charges
+    keep the anchor's day of month, clipped to short months (Jan 31 -> Feb 28).
+
+    Returns an (n_subscriptions, months) float array; column 0 is the current month.
+    """
+    n = len(anchors)
+    counts = np.zeros((n, months), dtype=np.int64)
+    bounds = month_boundaries(today, months)
+    lower = bounds[:-1].copy()
+    lower[0] = np.datetime64(today, "D")
+    upper = bounds[1:]
+
+    calendar = (cycles == MONTHLY) | (cycles == YEARLY)
+    if calendar.any():
+        anchor = anchors[calendar]
+        anchor_month = anchor.astype("datetime64[M]")
+        anchor_day = (anchor - anchor_month.astype("datetime64[D]")).astype(np.int64)  # 0-based
+        window_month = bounds[:-1].astype("datetime64[M]")
+        days_in_month = (upper - bounds[:-1]).astype(np.int64)
+
+        months_since = (window_month[None, :] - anchor_month[:, None]).astype(np.int64)
+        day = np.minimum(anchor_day[:, None], days_in_month[None, :] - 1)
+        charge_on = bounds[:-1][None, :] + day.astype("timedelta64[D]")
+        step = np.where(cycles[calendar] == YEARLY, 12, 1)[:, None]
+        counts[calendar] = (
+            (months_since >= 0)
+            & (months_since % step == 0)
+            & (charge_on >= lower[None, :])
+        )
+
+    fixed = ~calendar
+    if fixed.any():
+        # Charges at anchor + k * interval (k >= 0); the number before a boundary B
+        # is ceil((B - anchor) / interval), so per-window counts are differences
+        interval = np.where(cycles[fixed] == WEEKLY, 7, intervals[fixed])
+        interval = np.where(interval > 0, interval, DEFAULT_INTERVAL_DAYS)[:, None]
+        edges = np.concatenate(([lower[0]], upper))
+        elapsed = (edges[None, :] - anchors[fixed][:, None]).astype(np.int64)
+        before = np.maximum(0, -(-elapsed // interval))
+        counts[fixed] = np.diff(before, axis=1)
+
+    return counts * prices[:, None]
+
+
+def _subscription_arrays(rows) -> tuple:
+    """Columns of (renewal_date, price, billing_cycle, billing_interval_days, ...) rows as NumPy arrays."""
+    anchors = np.array([row[0] for row in rows], dtype="datetime64[D]")
+    prices = np.array([float(row[1]) for row in rows], dtype=np.float64)
+    cycles = np.array([CYCLE_CODES.get(row[2], MONTHLY) for row in rows], dtype=np.int8)
+    intervals = np.array([row[3] or 0 for row in rows], dtype=np.int64)
+    return anchors, prices, cycles, intervals
+
+
+def _forecast_columns():
+    return (
+        Subscription.renewal_date, Subscription.price,
+        Subscription.billing_cycle, Subscription.billing_interval_days,
+    )
+
+
+def forecast_user_spend(db: Session, user_id: int, months: int = 12, today: Optional[date] = None) -> dict:
+    """
+    Projected spend for each of the next `months` calendar months (current
+    month first, counting from today), overall and by category.
+    """
+    today = today or date.today()
+    rows = db.query(*_forecast_columns(), Subscription.category).filter(
+        Subscription.owner_id == user_id
+    ).all()
+    labels = [add_months(month_start(today), i).strftime("%Y-%m") for i in range(months)]
+
+    if not rows:
+        by_month = np.zeros(months)
+        by_category, categories = np.zeros((0, months)), []
+    else:
+        amounts = project_charges(*_subscription_arrays(rows), today, months)
+        categories, category_index = np.unique([row[4] for row in rows], return_inverse=True)
+        by_category = np.stack([
+            np.bincount(category_index, weights=amounts[:, j], minlength=len(categories))
+            for j in range(months)
+        ], axis=1)
+        by_month = amounts.sum(axis=0)
+
+    return {
+        "months": months,
+        "total": round(float(by_month.sum()), 2),
+        "by_category": {
+            str(category): round(float(total), 2)
+            for category, total in zip(categories, by_category.sum(axis=1))
+        },
+        "series": [
+            {
+                "month": label,
+                "total": round(float(by_month[j]), 2),
+                "categories": {
+                    str(category): round(float(by_category[i, j]), 2)
+                    for i, category in enumerate(categories)
+                    if by_category[i, j]
+                },
+            }
+            for j, label in enumerate(labels)
+        ],
+    }
+
+
+def forecast_cohort(
+    db: Session,
+    user_ids: Optional[Iterable[int]] = None,
+    months: int = 12,
+    today: Optional[date] = None,
+    chunk_size: Optional[int] = None,
+) -> dict[int, np.ndarray]:
+    """
+    Projected monthly spend for many users (all users by default), as
+    {user_id: array of `months` totals}. Subscriptions are streamed and
+    expanded `chunk_size` at a time, so memory stays bounded.
+    """
+    today = today or date.today()
+    chunk_size = chunk_size or settings.FORECAST_COHORT_CHUNK_SIZE
+    stmt = select(*_forecast_columns(), Subscription.owner_id).where(Subscription.owner_id.is_not(None))
+    if user_ids is not None:
+        stmt = stmt.where(Subscription.owner_id.in_(list(user_ids)))
+
+    totals: dict[int, np.ndarray] = {}
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+    for chunk in result.partitions(chunk_size):
+        amounts = project_charges(*_subscription_arrays(chunk), today, months)
+        owners, owner_index = np.unique([row[4] for row in chunk], return_inverse=True)
+        per_owner = np.stack([
+            np.bincount(owner_index, weights=amounts[:, j], minlength=len(owners))
+            for j in range(months)
+        ], axis=1)
+        for owner, projected in zip(owners.tolist(), per_owner):
+            totals[owner] = totals[owner] + projected if owner in totals else projected
+    return totals
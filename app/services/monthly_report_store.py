@@ -0,0 +1,121 @@
+# app/services/monthly_report_store.py
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import and_, exists
+from sqlalchemy.orm import Session
+from app.core.admission import PRIORITY_BACKGROUND
+from app.core.config import settings
+from app.db.database import SessionLocal, dialect_insert
+from app.db.models import MonthlyReport, Subscription, User
+from app.services.ai_monthly_report import (
+    month_windows, compute_monthly_aggregates_many, report_month, summarize_monthly_aggregates,
+)
+
+
+def get_stored_monthly_report(db: Session, user_id: int, month: str, data_version: int) -> Optional[dict]:
+    """The precomputed report for `month`, if it was built from the user's current data."""
+    row = db.query(MonthlyReport.payload).filter(
+        MonthlyReport.user_id == user_id,
+        MonthlyReport.month == month,
+        MonthlyReport.data_version == data_version,
+    ).first()
+    return row.payload if row else None
+
+
+def _users_needing_reports(db: Session, month: str, after_id: int, limit: int):
+    """
+    Next batch (by id) of users with subscriptions in the report window whose
+    stored report for `month` is missing or older than their data.
+    """
+    _, last_month_start, _ = month_windows(datetime.utcnow())
+    active = exists().where(
+        Subscription.owner_id == User.id,
+        Subscription.renewal_date >= last_month_start,
+    )
+    return (
+        db.query(User.id, User.data_version)
+        .outerjoin(MonthlyReport, and_(MonthlyReport.user_id == User.id, MonthlyReport.month == month))
+        .filter(
+            User.id > after_id,
+            active,
+            (MonthlyReport.id.is_(None)) | (MonthlyReport.data_version != User.data_version),
+        )
+        .order_by(User.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _store_reports(db: Session, rows: list[dict]):
+    if not rows:
+        return
+    upsert = dialect_insert(db)
+    stmt = upsert(MonthlyReport).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[MonthlyReport.user_id, MonthlyReport.month],
+        set_={
+            "data_version": stmt.excluded.data_version,
+            "payload": stmt.excluded.payload,
+            "generated_at": stmt.excluded.generated_at,
+        },
+    ))
+    db.commit()
+
+
+def precompute_monthly_reports(batch_size: int | None = None, concurrency: int | None = None) -> int:
+    """
+    Build this month's report for every active user whose stored report is
+    missing or stale.
+
+    Users are read in id-ordered batches; each batch's aggregates come from
+    one query, and the AI summaries run `concurrency` at a time at background
+    priority, so interactive requests keep precedence for LLM slots.
+    Degraded summaries are not stored; the next run retries them.
+
+    Returns the number of reports stored.
+    """
+    batch_size = batch_size or settings.REPORT_PRECOMPUTE_BATCH_SIZE
+    concurrency = concurrency or settings.REPORT_PRECOMPUTE_CONCURRENCY
+    month = report_month()
+    stored = 0
+    last_id = 0
+
+    def summarize(aggregates: dict):
+        return summarize_monthly_aggregates(
+            aggregates, priority=PRIORITY_BACKGROUND, deadline=settings.LLM_BACKGROUND_DEADLINE_SECONDS,
+        )
+
+    db = SessionLocal()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="report-precompute") as pool:
+            while True:
+                # Versions are read before the data, so a concurrent change
+                # can only make a stored row look stale, never fresh
+                users = _users_needing_reports(db, month, last_id, batch_size)
+                if not users:
+                    break
+                last_id = users[-1].id
+
+                aggregates = compute_monthly_aggregates_many(db, [user.id for user in users])
+                db.rollback()  # end the read transaction before the slow LLM calls
+
+                results = pool.map(summarize, [aggregates[user.id] for user in users])
+                now = datetime.utcnow()
+                rows = [
+                    {
+                        "user_id": user.id,
+                        "month": month,
+                        "data_version": user.data_version,
+                        "payload": report,
+                        "generated_at": now,
+                    }
+                    for user, (report, ok) in zip(users, results)
+                    if ok
+                ]
+                _store_reports(db, rows)
+                stored += len(rows)
+                print(f"📊 Precomputed {stored} monthly reports (through user {last_id})")
+    finally:
+        db.close()
+    return stored
@@ -0,0 +1,197 @@
+# app/services/notification_outbox.py
+import random
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal, dialect_insert
+from app.db.models import NotificationOutbox, Subscription, SubscriptionNotificationState, User
+from app.services.due_subscriptions import DUE_SCAN_CHUNK_SIZE, build_sub_info
+from app.services.email_service import build_due_reminder
+from app.services.smtp_dispatcher import SMTPDispatcher
+
+# Users whose digests are written per transaction during the scan
+ENQUEUE_COMMIT_EVERY = 500
+
+
+def _scan_due_with_state(db: Session, today: date, window_days: int, chunk_size: int):
+    """
+    Stream due/overdue subscriptions joined to the owner's email and the last
+    notified state, grouped by owner.
+    """
+    rows = (
+        db.query(
+            Subscription.owner_id,
+            User.email,
+            Subscription.id,
+            Subscription.name,
+            Subscription.renewal_date,
+            Subscription.price,
+            Subscription.category,
+            SubscriptionNotificationState.status,
+            SubscriptionNotificationState.renewal_date,
+        )
+        .join(User, User.id == Subscription.owner_id)
+        .outerjoin(
+            SubscriptionNotificationState,
+            SubscriptionNotificationState.subscription_id == Subscription.id,
+        )
+        .filter(Subscription.renewal_date <= today + timedelta(days=window_days))
+        .order_by(Subscription.owner_id, Subscription.renewal_date)
+        .yield_per(chunk_size)
+    )
+    return groupby(rows, key=itemgetter(0, 1))
+
+
+def _write_digests(db: Session, digests: list, states: list):
+    """Insert outbox rows and upsert notification state in one transaction."""
+    if digests:
+        db.execute(insert(NotificationOutbox), digests)
+    if states:
+        upsert = dialect_insert(db)
+        stmt = upsert(SubscriptionNotificationState).values(states)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SubscriptionNotificationState.subscription_id],
+            set_={
+                "status": stmt.excluded.status,
+                "renewal_date": stmt.excluded.renewal_date,
+                "notified_at": stmt.excluded.notified_at,
+            },
+        )
+        db.execute(stmt)
+    db.commit()
+
+
+def enqueue_due_reminders(window_days: int = 7, chunk_size: int = DUE_SCAN_CHUNK_SIZE) -> int:
+    """
+    Scan due and overdue subscriptions and enqueue one digest per user
+    containing only the subscriptions whose state changed since they were
+    last notified (new, moved from due-soon to overdue, or renewal date edited).
+
+    Outbox rows and the new notification state are committed together, so a
+    crash mid-run never loses or duplicates a digest: the rerun picks up
+    exactly the users that were not committed yet.
+
+    Returns the number of digests enqueued.
+    """
+    today = date.today()
+    now = datetime.utcnow()
+    reader = SessionLocal()
+    writer = SessionLocal()
+    enqueued = 0
+    digests, states = [], []
+    try:
+        for (owner_id, email), group in _scan_due_with_state(reader, today, window_days, chunk_size):
+            due_soon, overdue = [], []
+            for _, _, sub_id, name, renewal, price, category, last_status, last_renewal in group:
+                current = "overdue" if renewal < today else "due_soon"
+                if last_status == current and last_renewal == renewal:
+                    continue  # already told the user about this exact state
+
+                (overdue if current == "overdue" else due_soon).append(
+                    build_sub_info(name, renewal, price, category)
+                )
+                states.append({
+                    "subscription_id": sub_id,
+                    "status": current,
+                    "renewal_date": renewal,
+                    "notified_at": now,
+                })
+
+            if not due_soon and not overdue:
+                continue
+
+            digests.append({
+                "user_id": owner_id,
+                "recipient": email,
+                "payload": {"due_soon": due_soon, "overdue": overdue},
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+            })
+            enqueued += 1
+
+            if len(digests) >= ENQUEUE_COMMIT_EVERY:
+                _write_digests(writer, digests, states)
+                digests, states = [], []
+
+        _write_digests(writer, digests, states)
+    except Exception:
+        writer.rollback()
+        raise
+    finally:
+        reader.close()
+        writer.close()
+
+    return enqueued
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter, capped at one day."""
+    base = settings.OUTBOX_RETRY_BASE_SECONDS
+    ceiling = min(base * (2 ** (attempts - 1)), 86400)
+    return timedelta(seconds=random.uniform(base, max(base, ceiling)))
+
+
+def drain_outbox_batch(db: Session, dispatcher: SMTPDispatcher, batch_size: int) -> int:
+    """
+    Deliver one batch of pending outbox rows.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED so several
+    drainers can run side by side. Failed sends are rescheduled with backoff
+    and marked failed after OUTBOX_MAX_ATTEMPTS.
+
+    Returns the number of rows processed.
+    """
+    now = datetime.utcnow()
+    rows = (
+        db.query(NotificationOutbox)
+        .filter(
+            NotificationOutbox.status == "pending",
+            NotificationOutbox.next_attempt_at <= now,
+        )
+        .order_by(NotificationOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not rows:
+        db.commit()
+        return 0
+
+    results = dispatcher.send_all([build_due_reminder(row.recipient, row.payload) for row in rows])
+
+    for row, ok in zip(rows, results):
+        row.attempts += 1
+        if ok:
+            row.status = "sent"
+            row.sent_at = now
+            row.last_error = None
+        elif row.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            row.status = "failed"
+            row.last_error = "SMTP delivery failed; giving up"
+        else:
+            row.next_attempt_at = now + _retry_delay(row.attempts)
+            row.last_error = "SMTP delivery failed; will retry"
+
+    db.commit()
+    return len(rows)
+
+
+def drain_outbox(dispatcher: SMTPDispatcher, batch_size: int | None = None) -> int:
+    """Deliver pending outbox rows in batches until none are ready. Returns rows processed."""
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    processed = 0
+    db = SessionLocal()
+    try:
+        while True:
+            count = drain_outbox_batch(db, dispatcher, batch_size)
+            processed += count
+            if count < batch_size:
+                break
+    finally:
+        db.close()
+    return processed
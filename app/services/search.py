@@ -0,0 +1,134 @@
+# app/services/search.py
+from typing import Optional
+from sqlalchemy import func, literal, or_, select, text
+from sqlalchemy.orm import Session
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.trigram import TrigramIndex
+from app.db.database import engine
+from app.db.models import Subscription, User
+
+# GIN trigram indexes serve ILIKE '%q%' as well as the similarity operators
+_TRIGRAM_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_subscriptions_name_trgm "
+    "ON subscriptions USING gin (name gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_subscriptions_description_trgm "
+    "ON subscriptions USING gin (description gin_trgm_ops)",
+)
+
+# Per-engine answer to "is pg_trgm installed?"
+_trigram_support: dict[str, bool] = {}
+
+# (user_id, data_version) -> TrigramIndex; any change bumps the version, so entries never go stale
+_ngram_indexes = LRUCache(settings.SEARCH_INDEX_CACHE_USERS)
+
+
+def ensure_search_indexes() -> bool:
+    """
+    Install pg_trgm and its GIN indexes on PostgreSQL (idempotent). Returns
+    False where that is not possible, in which case search uses the n-gram
+    fallback.
+    """
+    if engine.dialect.name != "postgresql" or settings.SEARCH_BACKEND == "ngram":
+        return False
+    try:
+        # CONCURRENTLY cannot run inside a transaction, and keeps writes flowing on big tables
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in _TRIGRAM_DDL:
+                conn.execute(text(statement))
+    except Exception as e:
+        print(f"⚠️ Trigram search indexes unavailable, using the n-gram fallback: {e}")
+        return False
+    _trigram_support.pop(str(engine.url), None)
+    return True
+
+
+def _use_trigram(db: Session) -> bool:
+    bind = db.get_bind()
+    if settings.SEARCH_BACKEND == "ngram" or bind.dialect.name != "postgresql":
+        return False
+    key = str(bind.url)
+    if key not in _trigram_support:
+        _trigram_support[key] = db.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).first() is not None
+    return _trigram_support[key]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _trigram_search(db: Session, user_id: int, query: str, threshold: float, limit: int) -> list[tuple[int, float]]:
+    # Word similarity: how well the query matches some stretch of the text, so
+    # "netflx" finds "Netflix Premium" and a short query is not diluted by long names
+    score = func.greatest(
+        func.word_similarity(query, Subscription.name),
+        func.coalesce(func.word_similarity(query, Subscription.description), 0),
+    )
+    pattern = f"%{_escape_like(query)}%"
+    db.execute(select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True)))
+    stmt = (
+        select(Subscription.id, score.label("score"))
+        .where(
+            Subscription.owner_id == user_id,
+            or_(
+                literal(query).op("<%")(Subscription.name),
+                literal(query).op("<%")(Subscription.description),
+                Subscription.name.ilike(pattern, escape="\\"),
+                Subscription.description.ilike(pattern, escape="\\"),
+            ),
+        )
+        .order_by(score.desc(), Subscription.id)
+        .limit(limit)
+    )
+    return [(row.id, round(float(row.score), 4)) for row in db.execute(stmt)]
+
+
+def _ngram_index(db: Session, user_id: int) -> TrigramIndex:
+    version = db.query(User.data_version).filter(User.id == user_id).scalar()
+    key = (user_id, version)
+    index = _ngram_indexes.get(key)
+    if index is None:
+        index = TrigramIndex(db.execute(
+            select(Subscription.id, Subscription.name, Subscription.description)
+            .where(Subscription.owner_id == user_id)
+        ))
+        _ngram_indexes.set(key, index)
+    return index
+
+
+def search_subscriptions(
+    db: Session,
+    user_id: int,
+    query: str,
+    limit: Optional[int] = None,
+    threshold: Optional[float] = None,
+) -> list[tuple[Subscription, float]]:
+    """
+    Fuzzy search over a user's subscription names and descriptions, best
+    match first, as (subscription, score) pairs. Tolerates typos; plain
+    substring matches are always included.
+
+    Uses pg_trgm GIN indexes on PostgreSQL, else an in-memory n-gram index
+    per user, rebuilt only when the user's data changes.
+    """
+    limit = limit or settings.SEARCH_MAX_RESULTS
+    threshold = settings.SEARCH_SIMILARITY_THRESHOLD if threshold is None else threshold
+    query = query.strip()
+    if not query:
+        return []
+
+    if _use_trigram(db):
+        ranked = _trigram_search(db, user_id, query, threshold, limit)
+    else:
+        ranked = _ngram_index(db, user_id).search(query, threshold, limit)
+    if not ranked:
+        return []
+
+    subs = {
+        sub.id: sub
+        for sub in db.query(Subscription).filter(Subscription.id.in_([sub_id for sub_id, _ in ranked]))
+    }
+    return [(subs[sub_id], score) for sub_id, score in ranked if sub_id in subs]
@@ -0,0 +1,212 @@
+# app/services/smtp_dispatcher.py
+import queue
+import smtplib
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import Message
+from typing import Iterable, List, Optional
+from app.core.config import settings
+
+# Errors that mean the session is gone and should be replaced, not reused. Not
+# OSError as a whole: every SMTPException subclasses it, including permanent
+# per-message rejections (refused recipient or sender, DATA errors) after which
+# smtplib has already reset the session, so it can go back to the pool.
+_CONNECTION_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    smtplib.SMTPHeloError,
+    ConnectionError,
+    TimeoutError,
+    ssl.SSLError,  # includes SSLEOFError from a dead TLS session
+)
+
+
+def open_smtp_connection(
+    host: str,
+    port: int,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    use_tls: bool = True,
+    timeout: float = 30.0,
+) -> smtplib.SMTP:
+    """Open an SMTP session, upgrading to TLS and logging in when configured."""
+    server = smtplib.SMTP(host, port, timeout=timeout)
+    try:
+        if use_tls:
+            server.starttls()
+        if username:
+            server.login(username, password)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+class _PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.sent = 0
+
+    def close(self):
+        try:
+            self.server.quit()
+        except Exception:
+            self.server.close()
+
+
+class SMTPConnectionPool:
+    """
+    Small pool of authenticated SMTP sessions.
+
+    Sessions are opened lazily up to `size`, handed out one per sender thread,
+    and recycled after `max_messages` sends. A session that fails with a
+    connection error is discarded instead of going back to the pool.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        timeout: float = 30.0,
+        size: int = 4,
+        max_messages: int = 100,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.size = size
+        self.max_messages = max_messages
+
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _connect(self) -> _PooledConnection:
+        return _PooledConnection(open_smtp_connection(
+            self.host, self.port, self.username, self.password,
+            use_tls=self.use_tls, timeout=self.timeout,
+        ))
+
+    @contextmanager
+    def connection(self):
+        """Borrow a session; it is returned to the pool unless it broke."""
+        self._slots.acquire()
+        conn = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+
+            broken = False
+            try:
+                yield conn
+            except _CONNECTION_ERRORS:
+                broken = True
+                raise
+            finally:
+                conn.sent += 1
+                if broken or self._closed or conn.sent >= self.max_messages:
+                    conn.close()
+                else:
+                    self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every idle session."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class SMTPDispatcher:
+    """
+    Sends messages over a pooled set of SMTP sessions with bounded concurrency.
+
+    A send that hits a dropped session is retried on a fresh connection
+    up to `retries` times before it is reported as failed. Any other SMTP
+    error (e.g. a refused recipient) fails the message at once and keeps the
+    session.
+    """
+
+    def __init__(self, pool: SMTPConnectionPool, concurrency: Optional[int] = None, retries: int = 1):
+        self.pool = pool
+        self.concurrency = concurrency or pool.size
+        self.retries = retries
+
+    def send(self, msg: Message) -> bool:
+        """Send one message. Returns True on success."""
+        attempt = 0
+        while True:
+            try:
+                with self.pool.connection() as conn:
+                    conn.server.send_message(msg)
+                return True
+            except _CONNECTION_ERRORS as e:
+                attempt += 1
+                if attempt > self.retries:
+                    print(f"❌ Failed to send email to {msg['To']}: {e}")
+                    return False
+                print(f"🔁 SMTP session dropped ({e}); reconnecting for {msg['To']}...")
+            except Exception as e:
+                print(f"❌ Failed to send email to {msg['To']}: {e}")
+                return False
+
+    def send_many(self, messages: Iterable[Message]) -> dict:
+        """
+        Send messages concurrently, consuming `messages` lazily so a large
+        generator never has more than a few messages in flight.
+        """
+        in_flight = threading.BoundedSemaphore(self.concurrency * 2)
+        counts = {"sent": 0, "failed": 0}
+        lock = threading.Lock()
+
+        def _task(msg):
+            try:
+                ok = self.send(msg)
+                with lock:
+                    counts["sent" if ok else "failed"] += 1
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="smtp") as executor:
+            for msg in messages:
+                in_flight.acquire()
+                executor.submit(_task, msg)
+
+        return counts
+
+    def send_all(self, messages: List[Message]) -> List[bool]:
+        """Send a bounded batch concurrently and return per-message results, in order."""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="smtp") as executor:
+            return list(executor.map(self.send, messages))
+
+    def close(self):
+        self.pool.close()
+
+
+def create_dispatcher() -> SMTPDispatcher:
+    """Build a dispatcher from the SMTP settings."""
+    pool = SMTPConnectionPool(
+        host=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        username=settings.SMTP_EMAIL,
+        password=settings.SMTP_PASSWORD,
+        use_tls=settings.SMTP_USE_TLS,
+        timeout=settings.SMTP_TIMEOUT_SECONDS,
+        size=settings.SMTP_POOL_SIZE,
+        max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    )
+    return SMTPDispatcher(pool)
@@ -0,0 +1,247 @@
+# app/services/spend_ledger.py
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+from sqlalchemy import Date, cast, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal, dialect_insert
+from app.db.models import MonthlySpendRollup, SpendLedgerEntry, Subscription, SubscriptionChargeState
+
+# Used when a custom cycle has no interval (rows written before validation existed)
+DEFAULT_INTERVAL_DAYS = 30
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` away from `day`'s month."""
+    year, month = divmod(day.year * 12 + day.month - 1 + months, 12)
+    return date(year, month + 1, 1)
+
+
+def charge_date(anchor: date, cycle: str, interval_days: Optional[int], k: int) -> date:
+    """
+    The k-th charge of a subscription renewing on `anchor` (k=0 is the anchor),
+    by the rules forecast.project_charges vectorizes: monthly and yearly
+    charges keep the anchor's day of month, clipped to short months
+    (Jan 31 -> Feb 28); weekly and custom ones repeat every 7 or
+    `interval_days` days. Unknown cycles count as monthly.
+    """
+    if cycle == "weekly":
+        return anchor + timedelta(days=7 * k)
+    if cycle == "custom":
+        return anchor + timedelta(days=(interval_days or DEFAULT_INTERVAL_DAYS) * k)
+    first = add_months(anchor, k * (12 if cycle == "yearly" else 1))
+    days_in_month = (add_months(first, 1) - first).days
+    return first.replace(day=min(anchor.day, days_in_month))
+
+
+def charges_through(anchor: date, cycle: str, interval_days: Optional[int], until: date) -> tuple[list[date], date]:
+    """Charge dates from `anchor` through `until`, and the first charge after it."""
+    dates, k = [], 0
+    while (day := charge_date(anchor, cycle, interval_days, k)) <= until:
+        dates.append(day)
+        k += 1
+    return dates, day
+
+
+def _apply_rollup_increments(db: Session, increments: dict):
+    """Add {(user_id, month, category): [total, count]} onto monthly_spend_rollups."""
+    if not increments:
+        return
+    upsert = dialect_insert(db)
+    stmt = upsert(MonthlySpendRollup).values([
+        {"user_id": user_id, "month": month, "category": category, "total": total, "charge_count": count}
+        for (user_id, month, category), (total, count) in increments.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[MonthlySpendRollup.user_id, MonthlySpendRollup.month, MonthlySpendRollup.category],
+        set_={
+            "total": MonthlySpendRollup.total + stmt.excluded.total,
+            "charge_count": MonthlySpendRollup.charge_count + stmt.excluded.charge_count,
+        },
+    ))
+
+
+def _post_charges(db: Session, entries: list[dict]) -> int:
+    """
+    Append ledger entries and fold the ones actually inserted into the monthly
+    rollups. Entries already posted are skipped by the unique
+    (subscription_id, charged_on) constraint, so reposting is harmless.
+    The caller commits.
+    """
+    if not entries:
+        return 0
+    upsert = dialect_insert(db)
+    inserted = db.execute(
+        upsert(SpendLedgerEntry)
+        .values(entries)
+        .on_conflict_do_nothing(index_elements=[SpendLedgerEntry.subscription_id, SpendLedgerEntry.charged_on])
+        .returning(SpendLedgerEntry.user_id, SpendLedgerEntry.category,
+                   SpendLedgerEntry.amount, SpendLedgerEntry.charged_on)
+    ).all()
+
+    increments = defaultdict(lambda: [Decimal("0.00"), 0])
+    for user_id, category, amount, charged_on in inserted:
+        bucket = increments[(user_id, month_start(charged_on), category)]
+        bucket[0] += amount
+        bucket[1] += 1
+    _apply_rollup_increments(db, increments)
+    return len(inserted)
+
+
+def _save_charge_states(db: Session, states: list[dict]):
+    """Upsert how far each subscription has been charged."""
+    upsert = dialect_insert(db)
+    stmt = upsert(SubscriptionChargeState).values(states)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[SubscriptionChargeState.subscription_id],
+        set_={
+            column: stmt.excluded[column]
+            for column in ("renewal_date", "billing_cycle", "billing_interval_days", "charged_through", "next_charge_on")
+        },
+    ))
+
+
+def post_renewal_charges(today: Optional[date] = None, batch_size: Optional[int] = None) -> int:
+    """
+    Record a ledger charge for every renewal due by `today`, updating the
+    monthly rollups. Charges repeat by billing cycle from renewal_date, which
+    is left as the user set it; subscription_charge_state remembers the last
+    date charged and the next one due.
+
+    A subscription seen for the first time is charged for its latest cycle
+    date only, so a stale renewal date does not invent a backlog; after that
+    every cycle date is posted once (including ones missed while the job was
+    down). Only rows that are new, rescheduled by an edit, or past their
+    next_charge_on come back from the query. Batches are committed on their
+    own. Returns the number of charges posted.
+    """
+    today = today or date.today()
+    batch_size = batch_size or settings.LEDGER_POST_BATCH_SIZE
+    state = SubscriptionChargeState
+    posted = 0
+    last_id = 0
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.query(
+                Subscription.id, Subscription.owner_id, Subscription.name,
+                Subscription.category, Subscription.price, Subscription.renewal_date,
+                Subscription.billing_cycle, Subscription.billing_interval_days,
+                state.charged_through,
+            ).outerjoin(state, state.subscription_id == Subscription.id).filter(
+                Subscription.id > last_id,
+                Subscription.owner_id.is_not(None),
+                Subscription.renewal_date <= today,
+                or_(
+                    state.subscription_id.is_(None),
+                    state.next_charge_on <= today,
+                    state.renewal_date != Subscription.renewal_date,
+                    state.billing_cycle != Subscription.billing_cycle,
+                    state.billing_interval_days.is_distinct_from(Subscription.billing_interval_days),
+                ),
+            ).order_by(Subscription.id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            now = datetime.utcnow()
+            entries, states = [], []
+            for row in rows:
+                dates, next_charge = charges_through(
+                    row.renewal_date, row.billing_cycle, row.billing_interval_days, today
+                )
+                if row.charged_through is None:
+                    due = dates[-1:]
+                else:
+                    due = [day for day in dates if day > row.charged_through]
+                entries.extend(
+                    {
+                        "user_id": row.owner_id,
+                        "subscription_id": row.id,
+                        "name": row.name,
+                        "category": row.category,
+                        "amount": row.price,
+                        "charged_on": charged_on,
+                        "recorded_at": now,
+                    }
+                    for charged_on in due
+                )
+                states.append({
+                    "subscription_id": row.id,
+                    "renewal_date": row.renewal_date,
+                    "billing_cycle": row.billing_cycle,
+                    "billing_interval_days": row.billing_interval_days,
+                    "charged_through": due[-1] if due else row.charged_through,
+                    "next_charge_on": next_charge,
+                })
+
+            posted += _post_charges(db, entries)
+            _save_charge_states(db, states)
+            db.commit()
+    finally:
+        db.close()
+    return posted
+
+
+def rebuild_monthly_rollups(db: Session, user_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute monthly_spend_rollups from the ledger (repairs drift). The caller commits."""
+    if db.get_bind().dialect.name == "sqlite":
+        month = func.date(SpendLedgerEntry.charged_on, "start of month")
+    else:
+        month = cast(func.date_trunc("month", SpendLedgerEntry.charged_on), Date)
+    source = select(
+        SpendLedgerEntry.user_id, month, SpendLedgerEntry.category,
+        func.sum(SpendLedgerEntry.amount), func.count(),
+    ).group_by(SpendLedgerEntry.user_id, month, SpendLedgerEntry.category)
+    clear = delete(MonthlySpendRollup)
+
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        source = source.where(SpendLedgerEntry.user_id.in_(user_ids))
+        clear = clear.where(MonthlySpendRollup.user_id.in_(user_ids))
+
+    db.execute(clear)
+    result = db.execute(
+        insert(MonthlySpendRollup).from_select(
+            ["user_id", "month", "category", "total", "charge_count"], source
+        )
+    )
+    return result.rowcount
+
+
+def get_spend_timeseries(db: Session, user_id: int, months: int, today: Optional[date] = None) -> list[dict]:
+    """
+    Spend for the last `months` calendar months (oldest first, current month
+    included), zero-filled, from one range read on the rollup's primary key.
+    """
+    current = month_start(today or date.today())
+    start = add_months(current, -(months - 1))
+
+    rows = db.query(
+        MonthlySpendRollup.month, MonthlySpendRollup.category,
+        MonthlySpendRollup.total, MonthlySpendRollup.charge_count,
+    ).filter(
+        MonthlySpendRollup.user_id == user_id,
+        MonthlySpendRollup.month >= start,
+        MonthlySpendRollup.month <= current,
+    ).order_by(MonthlySpendRollup.month).all()
+
+    series = {
+        add_months(start, i): {"total": Decimal("0.00"), "charges": 0, "categories": {}}
+        for i in range(months)
+    }
+    for month, category, total, count in rows:
+        point = series[month]
+        point["total"] += total
+        point["charges"] += count
+        point["categories"][category] = total
+
+    return [{"month": month.strftime("%Y-%m"), **point} for month, point in series.items()]
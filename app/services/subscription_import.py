@@ -0,0 +1,333 @@
+# app/services/subscription_import.py
+import codecs
+import csv
+import json
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable, Iterator, Literal, Optional
+import anyio
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import Budget, Subscription, User
+from app.schemas.sub_schema import SubscriptionCreate
+from app.services.categorizer import categorize_many
+from app.services.categorization_worker import schedule_categorization_batch
+from app.services.category_totals import adjust_category_total
+from app.services.data_version import bump_data_version
+from app.services.suggestions import record_subscription_names
+
+ImportFormat = Literal["csv", "ndjson"]
+ImportMode = Literal["best_effort", "all_or_nothing"]
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+_REQUIRED_COLUMNS = {"name", "price", "renewal_date"}
+
+# A parsed record: (1-based row number, fields or None, parse error or None)
+Record = tuple[int, Optional[dict], Optional[str]]
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """Import format implied by a Content-Type header, if any."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return _CONTENT_TYPES.get(media_type)
+
+
+def iter_request_body(request: Request) -> Iterator[bytes]:
+    """
+    The request body chunk by chunk, for code running in the threadpool
+    (run_in_threadpool): each chunk is awaited on the event loop as needed,
+    so the body is never held in memory whole.
+    """
+    stream = request.stream()
+
+    async def next_chunk() -> Optional[bytes]:
+        try:
+            return await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    while (chunk := anyio.from_thread.run(next_chunk)) is not None:
+        if chunk:
+            yield chunk
+
+
+def iter_lines(chunks: Iterable[bytes], max_line_length: Optional[int] = None) -> Iterator[str]:
+    """Decode UTF-8 chunks (with or without a BOM) into lines, newline kept."""
+    max_line_length = max_line_length or settings.IMPORT_MAX_LINE_LENGTH
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    try:
+        for chunk in chunks:
+            *lines, buffer = (buffer + decoder.decode(chunk)).split("\n")
+            for line in lines:
+                yield line + "\n"
+            if len(buffer) > max_line_length:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Line longer than {max_line_length} characters.",
+                )
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body is not valid UTF-8.")
+    if buffer:
+        yield buffer
+
+
+def iter_records(lines: Iterable[str], fmt: ImportFormat) -> Iterator[Record]:
+    """Parse CSV (with a header row) or NDJSON lines into records, one at a time."""
+    if fmt == "ndjson":
+        number = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield number, None, "Expected a JSON object."
+                continue
+            yield number, record, None
+        return
+
+    reader = csv.DictReader(lines)
+    try:
+        missing = _REQUIRED_COLUMNS - set(reader.fieldnames or [])
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"CSV header is missing columns: {', '.join(sorted(missing))}.",
+            )
+        for number, row in enumerate(reader, 1):
+            if None in row:
+                yield number, None, "More fields than header columns."
+                continue
+            # Empty cells mean "not given", so optional fields fall back to their defaults
+            yield number, {key: value for key, value in row.items() if value not in (None, "")}, None
+    except csv.Error as e:
+        # The reader cannot resynchronize after malformed quoting
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed CSV: {e}")
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+class ImportReport:
+    """Counters and per-row errors of one import; only the first errors are kept."""
+
+    def __init__(self, mode: ImportMode):
+        self.mode = mode
+        self.total_rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+        self.committed = False
+        # Set when the body could not be read further; rows after `row` were never seen
+        self.fatal_error: Optional[dict] = None
+
+    def fail(self, row: int, error: str):
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+    def to_dict(self) -> dict:
+        return {
+            "mode": self.mode,
+            "total_rows": self.total_rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "committed": self.committed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "fatal_error": self.fatal_error,
+        }
+
+
+def _until_stream_error(records: Iterable[Record], report: ImportReport) -> Iterator[Record]:
+    """
+    Pass records through, turning a broken body (overlong line, bad UTF-8,
+    malformed CSV) into the report's fatal_error so earlier rows are still
+    accounted for. Errors before the first row (e.g. a bad CSV header) still
+    raise, since nothing has been imported yet.
+    """
+    last_row = 0
+    try:
+        for record in records:
+            last_row = record[0]
+            yield record
+    except HTTPException as e:
+        if not report.total_rows:
+            raise
+        report.fatal_error = {"row": last_row + 1, "error": e.detail}
+
+
+def _insert_batch(db: Session, user_id: int, batch: list[tuple[int, SubscriptionCreate, Decimal]]) -> list[int]:
+    """
+    Insert one batch with a multi-row INSERT and apply its rollup, budget and
+    data-version updates once. The caller commits. Returns ids left pending
+    categorization.
+    """
+    # Provisional keyword categories for rows without one, as create_subscription does;
+    # the LLM refines them in the background
+    uncategorized = [
+        i for i, (_, sub, _) in enumerate(batch)
+        if not sub.category or sub.category.lower() == "other"
+    ]
+    provisional = dict(zip(uncategorized, categorize_many(
+        [(batch[i][1].name, batch[i][1].description) for i in uncategorized]
+    )))
+
+    version = bump_data_version(db, user_id)
+    rows, totals = [], defaultdict(lambda: [0, Decimal("0.00")])
+    for i, (_, sub, price) in enumerate(batch):
+        category = provisional.get(i, sub.category)
+        rows.append({
+            "name": sub.name,
+            "description": sub.description,
+            "price": price,
+            "renewal_date": sub.renewal_date,
+            "category": category,
+            "category_status": "pending" if i in provisional else "resolved",
+            "billing_cycle": sub.billing_cycle,
+            "billing_interval_days": sub.billing_interval_days,
+            "owner_id": user_id,
+            "row_version": version,
+        })
+        totals[category][0] += 1
+        totals[category][1] += price
+
+    inserted = db.execute(insert(Subscription).returning(Subscription.id, Subscription.category_status), rows).all()
+    for category, (count, amount) in totals.items():
+        adjust_category_total(db, user_id, category, count, amount)
+    db.execute(
+        update(Budget)
+        .where(Budget.user_id == user_id)
+        .values(
+            current_spent=func.coalesce(Budget.current_spent, 0) + sum(price for _, _, price in batch),
+            row_version=version,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return [sub_id for sub_id, category_status in inserted if category_status == "pending"]
+
+
+def import_subscriptions(
+    db: Session,
+    user_id: int,
+    records: Iterable[Record],
+    mode: ImportMode = "best_effort",
+    batch_size: Optional[int] = None,
+) -> dict:
+    """
+    Validate and insert streamed records `batch_size` at a time.
+
+    best_effort commits every batch and skips invalid rows. all_or_nothing
+    keeps validating after the first bad row (to report every error) but
+    commits nothing unless all rows are valid, and then raises 422 with the
+    report. Budget limits apply as in create_subscription, cumulatively over
+    the import.
+
+    If the body breaks off mid-stream, best_effort keeps the rows read so far
+    and returns the report with fatal_error set; all_or_nothing rolls back
+    and raises 422 as for invalid rows.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    budget = db.query(Budget).filter(Budget.user_id == user_id).first()
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You must create a budget before adding subscriptions."
+        )
+    spent = budget.current_spent or Decimal("0.00")
+    limit, allow_over_limit = budget.monthly_limit, budget.allow_over_limit
+
+    report = ImportReport(mode)
+    batch: list[tuple[int, SubscriptionCreate, Decimal]] = []
+    pending_ids: list[int] = []
+    pending_names: list[str] = []
+
+    def flush():
+        nonlocal spent
+        try:
+            ids = _insert_batch(db, user_id, batch)
+            if mode == "best_effort":
+                db.commit()
+                schedule_categorization_batch(ids)
+                record_subscription_names(sub.name for _, sub, _ in batch)
+            else:
+                pending_ids.extend(ids)
+                pending_names.extend(sub.name for _, sub, _ in batch)
+            report.imported += len(batch)
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"❌ Import batch for user {user_id} failed: {e}")
+            spent -= sum(price for _, _, price in batch)
+            for number, _, _ in batch:
+                report.fail(number, "Could not be saved.")
+        batch.clear()
+
+    for number, record, error in _until_stream_error(records, report):
+        report.total_rows += 1
+        if error:
+            report.fail(number, error)
+            continue
+        try:
+            sub = SubscriptionCreate.model_validate(record)
+        except ValidationError as e:
+            report.fail(number, _describe(e))
+            continue
+
+        price = Decimal(str(sub.price))
+        if spent + price > limit and not allow_over_limit:
+            report.fail(number, f"Exceeds monthly budget limit of ₹{limit}; projected spend would be ₹{spent + price}.")
+            continue
+        spent += price
+
+        if mode == "all_or_nothing" and report.failed:
+            continue  # nothing will be written; just keep collecting errors
+        batch.append((number, sub, price))
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    if mode == "all_or_nothing":
+        if report.failed or report.fatal_error:
+            db.rollback()
+            report.imported = 0
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=report.to_dict())
+        db.commit()
+        schedule_categorization_batch(pending_ids)
+        record_subscription_names(pending_names)
+
+    report.committed = report.imported > 0
+    if report.fatal_error:
+        print(f"⚠️ Import for user {user_id} stopped at row {report.fatal_error['row']}: {report.fatal_error['error']}")
+    print(f"📥 Imported {report.imported}/{report.total_rows} subscriptions for user {user_id} ({mode})")
+    return report.to_dict()
+
+
+def import_subscription_stream(
+    db: Session, user: User, request: Request, fmt: ImportFormat, mode: ImportMode,
+) -> dict:
+    """Import straight from the request body; run it with run_in_threadpool."""
+    records = iter_records(iter_lines(iter_request_body(request)), fmt)
+    return import_subscriptions(db, user.id, records, mode)
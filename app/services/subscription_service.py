@@ -1,8 +1,18 @@
 from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 from app.db.models import Subscription, User
+from app.core.pagination import decode_cursor, encode_cursor
+from datetime import date
 from decimal import Decimal
-from app.services.ai_categorizer import predict_category
+from typing import Optional
+from app.services.categorizer import categorize_service
+from app.services.categorization_worker import schedule_categorization
+from app.services.data_version import bump_data_version
+from app.services.sync import record_tombstones
+from app.services.search import search_subscriptions
+from app.services.suggestions import record_subscription_names
+from app.services.category_totals import adjust_category_total, move_category_total
 
 
 def create_subscription(db: Session, user: User, sub_data):
@@ -52,32 +62,131 @@ def create_subscription(db: Session, user: User, sub_data):
     
     # ✅ Categorize subscription if category not provided
     if not data.get("category") or data.get("category", "").lower() == "other":
-        # Call categorizer and update the data dictionary
-        data["category"] = predict_category(data.get("name"), data.get("description"))
+        # Provisional keyword category now; the LLM resolves the final one in the background
+        data["category"] = categorize_service(data.get("name"), data.get("description"))
+        data["category_status"] = "pending"
+    else:
+        data["category_status"] = "resolved"
 
     # ✅ Create subscription linked to user
-    new_sub = Subscription(**data, owner=user_in_db)
+    version = bump_data_version(db, user_in_db.id)
+    new_sub = Subscription(**data, owner=user_in_db, row_version=version)
     db.add(new_sub)
-    db.commit()
-    db.refresh(new_sub)
+    adjust_category_total(db, user_in_db.id, data["category"], 1, data["price"])
 
-    # ✅ Update current_spent safely (Decimal arithmetic)
+    # ✅ Update current_spent safely (Decimal arithmetic), in the same
+    # transaction so the budget carries the same row version
     user_in_db.budget.current_spent = (
         user_in_db.budget.current_spent or Decimal("0.00")
-    ) + new_sub.price
+    ) + data["price"]
+    user_in_db.budget.row_version = version
 
     db.commit()
+    db.refresh(new_sub)
     db.refresh(user_in_db.budget)
+    record_subscription_names([new_sub.name])
+
+    if new_sub.category_status == "pending":
+        schedule_categorization(new_sub.id)
 
     # ✅ Return ORM object (will serialize via from_attributes=True)
     return new_sub
 
 
-def get_subscriptions(db: Session, user_id: int):
+# Columns a list request may project with fields=
+LIST_FIELDS = (
+    "id", "owner_id", "name", "description", "price", "renewal_date",
+    "category", "category_status", "billing_cycle", "billing_interval_days",
+)
+# sort= values; a leading "-" means descending. id breaks ties, so positions are unique
+SORT_KEYS = {"id": None, "renewal_date": date.fromisoformat, "price": Decimal}
+
+
+def list_subscriptions_page(
+    db: Session,
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    category: Optional[str] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    renewal_from: Optional[date] = None,
+    renewal_to: Optional[date] = None,
+    fields: Optional[list[str]] = None,
+) -> tuple[list[dict], Optional[str]]:
     """
-    Retrieve all subscriptions for a given user.
+    One page of a user's subscriptions, as dicts of the requested fields,
+    plus the cursor of the next page (None on the last one).
+
+    Keyset pagination: each page seeks past the previous page's last
+    (sort key, id) on an (owner_id, sort key, id) index, so page cost does
+    not grow with the account size or how deep the client has paged.
     """
-    return db.query(Subscription).filter(Subscription.owner_id == user_id).all()
+    descending = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key not in SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"sort must be one of: {', '.join(f'{name}, -{name}' for name in SORT_KEYS)}."
+        )
+    fields = fields or list(LIST_FIELDS)
+    unknown = [field for field in fields if field not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown fields: {', '.join(unknown)}."
+        )
+
+    sort_column = getattr(Subscription, key)
+    # The keyset columns are always read, even if not projected
+    columns = list(dict.fromkeys([*fields, key, "id"]))
+    stmt = select(*(getattr(Subscription, name) for name in columns)).where(Subscription.owner_id == user_id)
+
+    if category:
+        stmt = stmt.where(Subscription.category == category)
+    if min_price is not None:
+        stmt = stmt.where(Subscription.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Subscription.price <= max_price)
+    if renewal_from:
+        stmt = stmt.where(Subscription.renewal_date >= renewal_from)
+    if renewal_to:
+        stmt = stmt.where(Subscription.renewal_date <= renewal_to)
+
+    if cursor:
+        position = decode_cursor(cursor)
+        if position.get("sort") != sort:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor belongs to a different sort order."
+            )
+        try:
+            last_id = int(position["id"])
+            if key == "id":
+                stmt = stmt.where(Subscription.id < last_id if descending else Subscription.id > last_id)
+            else:
+                last = (SORT_KEYS[key](position["value"]), last_id)
+                keyset = tuple_(sort_column, Subscription.id)
+                stmt = stmt.where(keyset < last if descending else keyset > last)
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+    order = [sort_column, Subscription.id] if key != "id" else [Subscription.id]
+    stmt = stmt.order_by(*(column.desc() if descending else column.asc() for column in order))
+
+    # One extra row tells whether another page follows
+    rows = db.execute(stmt.limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        position = {"sort": sort, "id": last["id"]}
+        if key != "id":
+            position["value"] = str(last[key])
+        next_cursor = encode_cursor(position)
+
+    return [{field: row._mapping[field] for field in fields} for row in rows], next_cursor
 
 
 def get_subscription_by_id(db: Session, sub_id: int, user_id: int):
@@ -104,9 +213,25 @@ def update_subscription(db: Session, sub_id: int, user_id: int, sub_data):
     """
     sub = get_subscription_by_id(db, sub_id, user_id)
 
-    for field, value in sub_data.model_dump(exclude_unset=True).items():
+    update_data = sub_data.model_dump(exclude_unset=True)
+    old_category, old_price = sub.category, sub.price
+    for field, value in update_data.items():
         setattr(sub, field, value)
 
+    if sub.billing_cycle == "custom" and not sub.billing_interval_days:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="billing_interval_days is required for a custom billing cycle."
+        )
+
+    if (sub.category, sub.price) != (old_category, old_price):
+        move_category_total(db, user_id, old_category, old_price, sub.category, sub.price)
+
+    # An explicit category from the user wins over any pending AI categorization
+    if update_data.get("category"):
+        sub.category_status = "resolved"
+
+    sub.row_version = bump_data_version(db, user_id)
     db.commit()
     db.refresh(sub)
     return sub
@@ -141,21 +266,23 @@ def delete_subscription(db: Session, sub_id: int, user: User):
         current_spent - sub.price
     )
 
+    version = bump_data_version(db, user.id)
+    user_in_db.budget.row_version = version
     db.delete(sub)
+    record_tombstones(db, user.id, "subscription", [sub.id], version)
+    adjust_category_total(db, user.id, sub.category, -1, -sub.price)
     db.commit()
     db.refresh(user_in_db.budget)
 
     return {"message": "Subscription deleted successfully"}
 
 
-def get_subscription_by_name(db: Session, name: str, user_id: int):
+def get_subscription_by_name(db: Session, name: str, user_id: int, limit: Optional[int] = None):
     """
-    Retrieve subscriptions by name (case-insensitive partial match).
+    Retrieve subscriptions matching `name` in their name or description,
+    best match first (typo-tolerant, trigram-indexed; see services/search.py).
     """
-    subs = db.query(Subscription).filter(
-        Subscription.owner_id == user_id,
-        Subscription.name.ilike(f"%{name}%")
-    ).all()
+    subs = [sub for sub, _ in search_subscriptions(db, user_id, name, limit)]
 
     if not subs:
         raise HTTPException(
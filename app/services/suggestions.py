@@ -0,0 +1,97 @@
+# app/services/suggestions.py
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.prefix_index import PrefixIndex, normalize
+from app.db.database import SessionLocal
+from app.db.models import Subscription
+from app.services.categorizer import CATEGORY_KEYWORDS
+
+# Swapped whole on rebuild; built from the keywords alone until the first rebuild
+_index = PrefixIndex(
+    ((keyword.title(), category, 0) for category, keywords in CATEGORY_KEYWORDS.items() for keyword in keywords),
+    top_k=settings.SUGGEST_MAX_RESULTS,
+)
+
+_SPELLING_CHUNK = 500
+
+
+def _popular_names(db: Session) -> dict[str, tuple[str, str, int]]:
+    """
+    The most used subscription names across accounts, as
+    key -> (most common spelling, most common category, subscription count).
+    Names held by fewer than SUGGEST_MIN_OWNERS accounts are left out.
+    """
+    key = func.lower(func.trim(Subscription.name))
+    popular = db.execute(
+        select(key.label("key"))
+        .group_by(key)
+        .having(func.count(func.distinct(Subscription.owner_id)) >= settings.SUGGEST_MIN_OWNERS)
+        .order_by(func.count().desc())
+        .limit(settings.SUGGEST_INDEX_MAX_NAMES)
+    ).scalars().all()
+
+    spellings: dict[str, Counter] = defaultdict(Counter)
+    categories: dict[str, Counter] = defaultdict(Counter)
+    for i in range(0, len(popular), _SPELLING_CHUNK):
+        rows = db.execute(
+            select(key, Subscription.name, Subscription.category, func.count())
+            .where(key.in_(popular[i:i + _SPELLING_CHUNK]))
+            .group_by(key, Subscription.name, Subscription.category)
+        )
+        # Keys that differ only in inner whitespace merge here
+        for raw_key, name, category, count in rows:
+            spellings[normalize(raw_key)][name.strip()] += count
+            categories[normalize(raw_key)][category or "Other"] += count
+
+    return {
+        key: (spellings[key].most_common(1)[0][0], categories[key].most_common(1)[0][0], sum(spellings[key].values()))
+        for key in spellings
+    }
+
+
+def build_suggestion_index(db: Session) -> PrefixIndex:
+    """
+    Known-service keywords plus the most popular names in the table. Keywords
+    keep their curated category; popular spellings replace their labels
+    ("Youtube" -> "YouTube") and usage counts set the ranking.
+    """
+    terms: dict[str, list] = {}
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            terms.setdefault(normalize(keyword), [keyword.title(), category, 0])
+    for key, (label, category, count) in _popular_names(db).items():
+        term = terms.setdefault(key, [label, category, 0])
+        term[0] = label
+        term[2] += count
+    return PrefixIndex((tuple(term) for term in terms.values()), top_k=settings.SUGGEST_MAX_RESULTS)
+
+
+def rebuild_suggestion_index() -> int:
+    """Rebuild the autocomplete index from the database and swap it in. Returns the term count."""
+    global _index
+    db = SessionLocal()
+    try:
+        index = build_suggestion_index(db)
+    finally:
+        db.close()
+    _index = index
+    return len(index)
+
+
+def record_subscription_names(names: Iterable[str]):
+    """
+    Count newly saved subscriptions towards their names' ranking. Names not
+    in the index wait for the next rebuild, which also applies the
+    SUGGEST_MIN_OWNERS rule to them.
+    """
+    index = _index
+    for name, count in Counter(normalize(name) for name in names).items():
+        index.increment(name, count)
+
+
+def suggest_names(query: str, limit: Optional[int] = None) -> list[dict]:
+    """Ranked service names starting with `query`, with their category."""
+    return [{"name": name, "category": category} for name, category in _index.lookup(query, limit)]
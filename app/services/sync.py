@@ -0,0 +1,142 @@
+# app/services/sync.py
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Union
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, DateTime, Select, String, delete, insert, literal, select, tuple_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.database import SessionLocal
+from app.db.models import Budget, Subscription, SyncTombstone, User
+
+SUBSCRIPTION_COLUMNS = (
+    Subscription.id, Subscription.name, Subscription.description, Subscription.price,
+    Subscription.renewal_date, Subscription.category, Subscription.category_status,
+    Subscription.billing_cycle, Subscription.billing_interval_days,
+    Subscription.row_version, Subscription.updated_at,
+)
+BUDGET_COLUMNS = (
+    Budget.id, Budget.monthly_limit, Budget.current_spent, Budget.allow_over_limit,
+    Budget.row_version, Budget.updated_at,
+)
+
+
+def record_tombstones(
+    db: Session, user_id: int, entity: str, entity_ids: Union[Iterable[int], Select], row_version: int,
+):
+    """
+    Remember deleted rows for /sync. Call it before deleting them, in the same
+    transaction, with the version returned by bump_data_version.
+    `entity_ids` may be a SELECT of ids for bulk deletes.
+    """
+    now = datetime.utcnow()
+    if isinstance(entity_ids, Select):
+        ids = entity_ids.subquery()
+        db.execute(insert(SyncTombstone).from_select(
+            ["user_id", "entity", "entity_id", "row_version", "deleted_at"],
+            select(
+                literal(user_id, Integer), literal(entity, String), ids.c[0],
+                literal(row_version, Integer), literal(now, DateTime),
+            ),
+        ))
+        return
+    rows = [
+        {"user_id": user_id, "entity": entity, "entity_id": entity_id, "row_version": row_version, "deleted_at": now}
+        for entity_id in entity_ids
+    ]
+    if rows:
+        db.execute(insert(SyncTombstone), rows)
+
+
+def _invalid_cursor():
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync cursor.")
+
+
+def get_changes(db: Session, user_id: int, since: Optional[str] = None, limit: Optional[int] = None) -> dict:
+    """
+    Subscription and budget changes after the `since` cursor, for clients
+    keeping a local copy. Without a cursor (or with one older than the
+    tombstone retention) everything is returned with reset=true.
+
+    Every change is stamped with the owner's data_version, which only grows,
+    so a sync round is a range scan on (owner_id, row_version): its cost
+    follows the amount of change, not the account size. A round whose
+    subscription changes exceed `limit` is split into pages (has_more=true);
+    deletes and the budget come with the first page.
+    """
+    limit = limit or settings.SYNC_PAGE_SIZE
+    now = time.time()
+    position = decode_cursor(since) if since else None
+    try:
+        # Deletes older than the retention window are purged, so such a cursor could miss some
+        reset = position is None or now - float(position["t"]) > settings.SYNC_TOMBSTONE_RETENTION_DAYS * 86400
+        since_version = -1 if reset else int(position["v"])
+        # Mid-round cursors pin the round's upper bound and the last row delivered
+        target = int(position["to"]) if position and "to" in position else None
+        after = (int(position["rv"]), int(position["id"])) if target is not None else None
+    except (KeyError, TypeError, ValueError):
+        raise _invalid_cursor()
+    if reset:
+        target = after = None
+    if target is None:
+        target = db.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+    stmt = select(*SUBSCRIPTION_COLUMNS).where(
+        Subscription.owner_id == user_id,
+        Subscription.row_version > since_version,
+        Subscription.row_version <= target,
+    )
+    if after:
+        stmt = stmt.where(tuple_(Subscription.row_version, Subscription.id) > after)
+    rows = db.execute(stmt.order_by(Subscription.row_version, Subscription.id).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    result = {
+        "reset": reset and after is None,
+        "has_more": has_more,
+        "subscriptions": [dict(row._mapping) for row in rows],
+        "budget": None,
+        "deleted": [],
+    }
+
+    if after is None:
+        budget = db.execute(select(*BUDGET_COLUMNS).where(
+            Budget.user_id == user_id,
+            Budget.row_version > since_version,
+            Budget.row_version <= target,
+        )).first()
+        result["budget"] = dict(budget._mapping) if budget else None
+        if not reset:
+            result["deleted"] = [
+                {"entity": entity, "id": entity_id}
+                for entity, entity_id in db.query(SyncTombstone.entity, SyncTombstone.entity_id).filter(
+                    SyncTombstone.user_id == user_id,
+                    SyncTombstone.row_version > since_version,
+                    SyncTombstone.row_version <= target,
+                ).order_by(SyncTombstone.row_version, SyncTombstone.id)
+            ]
+
+    if has_more:
+        last = rows[-1]
+        cursor = {"v": since_version, "t": now if reset else position["t"],
+                  "to": target, "rv": last.row_version, "id": last.id}
+    else:
+        cursor = {"v": target, "t": now}
+    result["cursor"] = encode_cursor(cursor)
+    return result
+
+
+def purge_tombstones(retention_days: Optional[int] = None) -> int:
+    """Delete tombstones past retention. Returns rows removed."""
+    retention_days = retention_days or settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    # A day of slack so a cursor just inside the window never misses a delete
+    cutoff = datetime.utcnow() - timedelta(days=retention_days + 1)
+    db = SessionLocal()
+    try:
+        removed = db.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff)).rowcount
+        db.commit()
+        return removed
+    finally:
+        db.close()
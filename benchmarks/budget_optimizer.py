@@ -0,0 +1,76 @@
+# benchmarks/budget_optimizer.py
+"""
+Time the /budget/optimize solver against subscription count. Each user
+has mixed billing cycles, weighted categories and a downgrade option on a
+third of their subscriptions, and must cut spend to --target-ratio of today.
+
+    python -m benchmarks.budget_optimizer --target-ratio 0.6
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.schemas.budget_schema import BudgetOptimizeRequest
+from app.services.budget_optimizer import plan_cancellations
+from app.services.forecast import monthly_equivalent
+
+CATEGORIES = ["Entertainment", "Music", "Cloud", "Productivity", "Fitness", "News", "Gaming", "Other"]
+
+
+def synthetic_rows(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    cycles = ["monthly"] * 6 + ["yearly"] * 2 + ["weekly", "custom"]
+    rows = []
+    for i in range(count):
+        cycle = rng.choice(cycles)
+        rows.append(SimpleNamespace(
+            id=i,
+            name=f"service-{i}",
+            category=rng.choice(CATEGORIES),
+            price=Decimal(str(round(rng.uniform(1, 60), 2))),
+            billing_cycle=cycle,
+            billing_interval_days=rng.randint(10, 120) if cycle == "custom" else None,
+        ))
+    return rows
+
+
+def synthetic_request(rows: list, seed: int = 7) -> BudgetOptimizeRequest:
+    rng = random.Random(seed)
+    return BudgetOptimizeRequest(
+        category_weights={category: rng.uniform(0.2, 3) for category in CATEGORIES},
+        downgrades=[
+            {"subscription_id": row.id, "price": row.price / 2, "value_retained": rng.uniform(0.3, 0.9)}
+            for row in rows[::3]
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ratio", type=float, default=0.6)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for count in (50, 100, 250, 500, 1000, 2000):
+        rows = synthetic_rows(count)
+        request = synthetic_request(rows)
+        current = sum(monthly_equivalent(row.price, row.billing_cycle, row.billing_interval_days) for row in rows)
+        target = Decimal(str(round(current * args.target_ratio, 2)))
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            plan = plan_cancellations(rows, target, request)
+            timings.append(time.perf_counter() - start)
+        assert plan["feasible"] and plan["projected_spend"] <= plan["target_spend"]
+
+        timings.sort()
+        print(f"{count:5d} subscriptions: median {timings[len(timings) // 2] * 1000:7.1f} ms, "
+              f"worst {timings[-1] * 1000:7.1f} ms, {len(plan['actions'])} changes, "
+              f"${plan['current_spend']:.2f} -> ${plan['projected_spend']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
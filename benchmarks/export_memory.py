@@ -0,0 +1,106 @@
+# benchmarks/export_memory.py
+"""
+Peak RSS while exporting one account's subscriptions: the GET /subscriptions/
+path (every row loaded as an ORM object, then serialized as one JSON array)
+vs the streaming CSV/NDJSON export.
+
+Each measurement runs in a fresh process against a temporary SQLite file,
+and reports peak RSS growth over the process's baseline.
+
+    python -m benchmarks.export_memory --sizes 50 50000 500000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert
+
+from app.db.database import Base, SessionLocal
+from app.db.models import Subscription, User
+
+
+def _peak_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+
+
+def seed(url: str, rows: int) -> int:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    SessionLocal.configure(bind=engine)
+    rng = random.Random(7)
+    today = date.today()
+    db = SessionLocal()
+    try:
+        user = User(email=f"export-{rows}@example.com", username=f"export-{rows}", hashed_password="x")
+        db.add(user)
+        db.commit()
+        for start in range(0, rows, 10000):
+            db.execute(insert(Subscription), [
+                {
+                    "name": f"Service {i}",
+                    "description": "Synthetic subscription for the export benchmark",
+                    "price": round(rng.uniform(1, 100), 2),
+                    "renewal_date": today + timedelta(days=i % 365),
+                    "category": rng.choice(["Entertainment", "Productivity", "Utilities"]),
+                    "owner_id": user.id,
+                }
+                for i in range(start, min(rows, start + 10000))
+            ])
+            db.commit()
+        return user.id
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def _measure(url: str, user_id: int, method: str, queue):
+    # Imported here so the baseline already includes the app's own footprint
+    from app.schemas.sub_schema import SubscriptionResponse
+    from app.services.export import stream_export, subscription_export_query
+
+    SessionLocal.configure(bind=create_engine(url))
+    baseline = _peak_rss_kb()
+    start = time.perf_counter()
+    if method == "list (ORM + JSON array)":
+        db = SessionLocal()
+        try:
+            # The unpaginated list query GET /subscriptions/ used to run
+            subs = db.query(Subscription).filter(Subscription.owner_id == user_id).all()
+            body = json.dumps([SubscriptionResponse.model_validate(s).model_dump(mode="json") for s in subs]).encode()
+            size = len(body)
+        finally:
+            db.close()
+    else:
+        fmt = "csv" if "csv" in method else "ndjson"
+        size = sum(len(chunk) for chunk in stream_export(subscription_export_query(user_id), fmt))
+    queue.put((time.perf_counter() - start, size, _peak_rss_kb() - baseline))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 50000, 500000])
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            url = f"sqlite:///{os.path.join(tmp, f'export-{rows}.db')}"
+            user_id = seed(url, rows)
+            print(f"{rows} subscriptions")
+            for method in ("list (ORM + JSON array)", "export (csv)", "export (ndjson)"):
+                queue = ctx.Queue()
+                process = ctx.Process(target=_measure, args=(url, user_id, method, queue))
+                process.start()
+                elapsed, size, peak_kb = queue.get()
+                process.join()
+                print(f"  {method:24s}: {elapsed:6.2f} s, {size / 1e6:7.1f} MB out, peak RSS +{peak_kb / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/forecast_engine.py
+"""
+Compare the NumPy forecast engine with a naive per-subscription loop that
+walks every renewal date one by one, on synthetic subscriptions with mixed
+billing cycles. Both must produce the same monthly totals.
+
+    python -m benchmarks.forecast_engine --months 36
+"""
+import argparse
+import calendar
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.forecast import CYCLE_CODES, project_charges
+from app.services.spend_ledger import add_months, month_start
+
+
+def naive_forecast(subscriptions, today: date, months: int) -> list[float]:
+    """Walk each subscription's renewals from its anchor and bucket those in the horizon."""
+    start = month_start(today)
+    end = add_months(start, months)
+    totals = [0.0] * months
+    for anchor, price, cycle, interval in subscriptions:
+        k = 0
+        while True:
+            if cycle in ("monthly", "yearly"):
+                first = add_months(anchor, k * (12 if cycle == "yearly" else 1))
+                last_day = calendar.monthrange(first.year, first.month)[1]
+                charge_on = first.replace(day=min(anchor.day, last_day))
+            else:
+                charge_on = anchor + timedelta(days=k * (7 if cycle == "weekly" else interval))
+            if charge_on >= end:
+                break
+            if charge_on >= today:
+                index = (charge_on.year - start.year) * 12 + charge_on.month - start.month
+                totals[index] += price
+            k += 1
+    return totals
+
+
+def synthetic_subscriptions(count: int, today: date, seed: int = 7):
+    rng = random.Random(seed)
+    cycles = ["monthly"] * 6 + ["yearly"] * 2 + ["weekly", "custom"]
+    subscriptions = []
+    for _ in range(count):
+        cycle = rng.choice(cycles)
+        interval = rng.randint(10, 120) if cycle == "custom" else None
+        anchor = today + timedelta(days=rng.randint(-60, 400))
+        subscriptions.append((anchor, round(rng.uniform(1, 100), 2), cycle, interval))
+    return subscriptions
+
+
+def vectorized_forecast(subscriptions, today: date, months: int) -> np.ndarray:
+    anchors = np.array([s[0] for s in subscriptions], dtype="datetime64[D]")
+    prices = np.array([s[1] for s in subscriptions], dtype=np.float64)
+    cycles = np.array([CYCLE_CODES[s[2]] for s in subscriptions], dtype=np.int8)
+    intervals = np.array([s[3] or 0 for s in subscriptions], dtype=np.int64)
+    return project_charges(anchors, prices, cycles, intervals, today, months).sum(axis=0)
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months", type=int, default=36)
+    args = parser.parse_args()
+    today = date.today()
+
+    for count in (100, 1000, 10000, 100000):
+        subscriptions = synthetic_subscriptions(count, today)
+        expected = naive_forecast(subscriptions, today, args.months)
+        actual = vectorized_forecast(subscriptions, today, args.months)
+        assert np.allclose(expected, actual), "forecasts differ"
+
+        naive = _time(lambda: naive_forecast(subscriptions, today, args.months))
+        vectorized = _time(lambda: vectorized_forecast(subscriptions, today, args.months))
+        print(f"{count} subscriptions, {args.months} months")
+        print(f"  naive loop : {naive * 1000:8.1f} ms")
+        print(f"  numpy      : {vectorized * 1000:8.1f} ms")
+        print(f"  speedup    : {naive / vectorized:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/fuzzy_search.py
+"""
+Search latency over a large subscriptions table: the old
+`name ILIKE '%q%'` scan vs search_subscriptions (pg_trgm GIN indexes on
+PostgreSQL, the in-memory n-gram index elsewhere).
+
+Rows are spread over --users accounts; every query runs for a sample of
+them. On SQLite the first search per user builds its n-gram index, so it
+is reported separately from warm searches. The old query only finds exact
+substrings of the name, so its hit rate drops to zero on typos.
+
+    python -m benchmarks.fuzzy_search --rows 1000000
+    python -m benchmarks.fuzzy_search --rows 1000000 --database-url postgresql://...
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert
+
+import app.services.search as search
+from app.db.database import Base, SessionLocal
+from app.db.models import Subscription, User
+from app.services.search import ensure_search_indexes, search_subscriptions
+
+SERVICES = [
+    "Netflix", "Spotify", "Notion", "Dropbox", "Figma", "Steam", "Coursera", "Strava",
+    "Disney Plus", "YouTube Premium", "Adobe Creative Cloud", "GitHub", "Slack", "Zoom",
+]
+PLANS = ["Basic", "Standard", "Premium", "Family", "Pro", "Team", "Student"]
+DESCRIPTIONS = ["4K streaming", "cloud storage", "design tools", "team chat", "online courses", "music", None]
+QUERIES = ["netflix", "netflx", "spotfy family", "creative cloud", "storage", "zzqx"]
+
+
+def seed(rows: int, users: int) -> list[int]:
+    rng = random.Random(7)
+    today = date.today()
+    db = SessionLocal()
+    try:
+        db.add_all(
+            User(email=f"search-{i}@example.com", username=f"search-{i}", hashed_password="x")
+            for i in range(users)
+        )
+        db.commit()
+        user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+        batch = []
+        for i in range(rows):
+            batch.append({
+                "owner_id": user_ids[i % users],
+                "name": f"{rng.choice(SERVICES)} {rng.choice(PLANS)} {i}",
+                "description": rng.choice(DESCRIPTIONS),
+                "price": round(rng.uniform(1, 50), 2),
+                "renewal_date": today + timedelta(days=rng.randint(0, 60)),
+                "category": "Other",
+            })
+            if len(batch) == 20000:
+                db.execute(insert(Subscription), batch)
+                batch.clear()
+        if batch:
+            db.execute(insert(Subscription), batch)
+        db.commit()
+        return user_ids
+    finally:
+        db.close()
+
+
+def old_search(db, user_id: int, query: str) -> list:
+    # What get_subscription_by_name ran before
+    return db.query(Subscription).filter(
+        Subscription.owner_id == user_id,
+        Subscription.name.ilike(f"%{query}%"),
+    ).all()
+
+
+def timed(fn) -> tuple[float, int]:
+    start = time.perf_counter()
+    found = len(fn())
+    return (time.perf_counter() - start) * 1000, found
+
+
+def report(label: str, samples: list[tuple[float, int]]):
+    times = sorted(ms for ms, _ in samples)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    hits = sum(1 for _, found in samples if found)
+    print(f"  {label:14s}: p50 {statistics.median(times):8.2f} ms  p95 {p95:8.2f} ms  hit rate {hits}/{len(samples)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--sample-users", type=int, default=10)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    tmp = None
+    url = args.database_url
+    if url is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{tmp.name}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    SessionLocal.configure(bind=engine)
+    search.engine = engine
+
+    try:
+        start = time.perf_counter()
+        user_ids = seed(args.rows, args.users)
+        print(f"Seeded {args.rows} rows for {args.users} users in {time.perf_counter() - start:.1f} s")
+        print(f"Trigram indexes: {'yes' if ensure_search_indexes() else 'no (n-gram fallback)'}")
+
+        sample = user_ids[:args.sample_users]
+        db = SessionLocal()
+        try:
+            cold = [timed(lambda: search_subscriptions(db, user_id, QUERIES[0])) for user_id in sample]
+            if engine.dialect.name != "postgresql":
+                report("index build", cold)
+            for query in QUERIES:
+                print(f"'{query}'")
+                report("ILIKE", [timed(lambda: old_search(db, user_id, query)) for user_id in sample])
+                report("indexed", [timed(lambda: search_subscriptions(db, user_id, query)) for user_id in sample])
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/keyword_categorizer.py
+"""
+Compare the compiled KeywordMatcher with the previous nested-loop substring
+categorizer on synthetic service names.
+
+The nested loop returns on the first category with any substring hit, so on
+long keyword-dense text it can stop early; that same shortcut is what gave
+it false positives and ignored keyword priority. The "no keyword present"
+scenario shows the full-scan cost both approaches pay in the worst case.
+
+    python -m benchmarks.keyword_categorizer --names 50000
+"""
+import argparse
+import random
+import time
+
+from app.services.categorizer import CATEGORY_KEYWORDS, categorize_many
+
+
+def legacy_categorize(name: str, description: str | None = None) -> str:
+    """The original categorize_service: substring test for every keyword."""
+    text = f"{name} {description or ''}".lower()
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text:
+                return category
+    return "Other"
+
+
+FILLER_WORDS = [
+    "premium", "family", "plan", "monthly", "annual", "pro", "team", "video",
+    "music", "simply", "visa", "teams", "media", "service", "renewal", "basic",
+]
+
+
+def synthetic_names(count: int, max_words: int, keyword_rate: float = 0.25, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    keywords = [k for ks in CATEGORY_KEYWORDS.values() for k in ks]
+    names = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(1, max_words)):
+            roll = rng.random()
+            if roll < keyword_rate:
+                words.append(rng.choice(keywords))
+            elif roll < keyword_rate + 0.35:
+                words.append(rng.choice(FILLER_WORDS))
+            else:
+                words.append("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 10))))
+        names.append(" ".join(words).title())
+    return names
+
+
+def _time(fn, repeat: int = 3) -> float:
+    return min(_once(fn) for _ in range(repeat))
+
+
+def _once(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=50000)
+    args = parser.parse_args()
+
+    scenarios = (
+        ("short names (1-4 words)", 4, 0.25),
+        ("long descriptions (1-40 words)", 40, 0.25),
+        ("long descriptions, no keyword present", 40, 0.0),
+    )
+    for label, max_words, keyword_rate in scenarios:
+        names = synthetic_names(args.names, max_words, keyword_rate)
+        legacy = _time(lambda: [legacy_categorize(n) for n in names])
+        compiled = _time(lambda: categorize_many(names))
+        changed = sum(a != b for a, b in zip(map(legacy_categorize, names), categorize_many(names)))
+        print(f"{label}, {args.names} inputs")
+        print(f"  nested loop      : {legacy * 1000:8.1f} ms ({args.names / legacy:,.0f}/s)")
+        print(f"  compiled matcher : {compiled * 1000:8.1f} ms ({args.names / compiled:,.0f}/s)")
+        print(f"  speedup          : {legacy / compiled:8.1f}x")
+        print(f"  results differing (boundary/priority fixes): {changed}")
+
+
+if __name__ == "__main__":
+    main()
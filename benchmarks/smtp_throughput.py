@@ -0,0 +1,93 @@
+# benchmarks/smtp_throughput.py
+"""
+Compare reminder email throughput: one SMTP connection per email (the old
+path) vs the pooled SMTPDispatcher.
+
+Runs against a local aiosmtpd sink, so nothing leaves the machine:
+
+    pip install aiosmtpd
+    python -m benchmarks.smtp_throughput --messages 500 --pool-size 4
+
+The sink can add artificial per-connection latency (--connect-delay) to
+approximate a remote server's TLS handshake and login.
+"""
+import argparse
+import asyncio
+import time
+
+from aiosmtpd.controller import Controller
+
+from app.services.email_service import build_due_reminder
+from app.services.smtp_dispatcher import SMTPConnectionPool, SMTPDispatcher, open_smtp_connection
+
+SAMPLE_RESULT = {
+    "due_soon": [{"name": "Netflix", "renewal_date": "2025-01-05", "price": 649.0, "category": "Entertainment"}],
+    "overdue": [{"name": "Notion", "renewal_date": "2024-12-28", "price": 400.0, "category": "Productivity"}],
+}
+
+
+class SinkHandler:
+    def __init__(self, connect_delay: float):
+        self.connect_delay = connect_delay
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        # EHLO happens once per connection, so this models handshake cost
+        await asyncio.sleep(self.connect_delay)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def _messages(n: int):
+    return [build_due_reminder(f"user{i}@example.com", SAMPLE_RESULT) for i in range(n)]
+
+
+def run_per_connection(host: str, port: int, n: int) -> float:
+    start = time.perf_counter()
+    for msg in _messages(n):
+        with open_smtp_connection(host, port, use_tls=False) as server:
+            server.send_message(msg)
+    return time.perf_counter() - start
+
+
+def run_pooled(host: str, port: int, n: int, pool_size: int) -> float:
+    pool = SMTPConnectionPool(host, port, use_tls=False, size=pool_size, max_messages=1000)
+    dispatcher = SMTPDispatcher(pool)
+    start = time.perf_counter()
+    counts = dispatcher.send_many(iter(_messages(n)))
+    elapsed = time.perf_counter() - start
+    dispatcher.close()
+    assert counts["failed"] == 0, counts
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--connect-delay", type=float, default=0.02,
+                        help="seconds of simulated handshake cost per connection")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    handler = SinkHandler(args.connect_delay)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        baseline = run_per_connection("127.0.0.1", args.port, args.messages)
+        pooled = run_pooled("127.0.0.1", args.port, args.messages, args.pool_size)
+    finally:
+        controller.stop()
+
+    print(f"messages: {args.messages}, pool size: {args.pool_size}, connect delay: {args.connect_delay}s")
+    print(f"one connection per email : {args.messages / baseline:8.1f} msg/s ({baseline:.2f}s)")
+    print(f"pooled dispatcher        : {args.messages / pooled:8.1f} msg/s ({pooled:.2f}s)")
+    print(f"speedup                  : {baseline / pooled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
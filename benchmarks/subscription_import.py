@@ -0,0 +1,134 @@
+# benchmarks/subscription_import.py
+"""
+Rows per second for onboarding a user's subscriptions: one
+create_subscription call per row (what N POSTs cost, minus HTTP) vs the
+streaming bulk importer fed the same rows as CSV and NDJSON chunks.
+
+Half the rows carry no category, so both paths pay for provisional keyword
+categorization. The background LLM step is disabled in both, since it runs
+off the request path either way.
+
+    python -m benchmarks.subscription_import --rows 5000
+    python -m benchmarks.subscription_import --rows 5000 --database-url postgresql://...
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import app.services.subscription_import as subscription_import
+import app.services.subscription_service as subscription_service
+from app.db.database import Base, SessionLocal
+from app.db.models import Budget, User
+from app.schemas.sub_schema import SubscriptionCreate
+from app.services.subscription_import import import_subscriptions, iter_lines, iter_records
+
+NAMES = ["Netflix", "Spotify", "Notion", "Dropbox", "Figma", "Steam", "Coursera", "Strava", "Acme Cloud", "Local Gym"]
+FIELDS = ["name", "description", "price", "renewal_date", "category", "billing_cycle"]
+
+
+def synthetic_rows(count: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    today = date.today()
+    return [
+        {
+            "name": f"{rng.choice(NAMES)} {i}",
+            "description": None,
+            "price": round(rng.uniform(1, 5), 2),
+            "renewal_date": (today + timedelta(days=rng.randint(0, 60))).isoformat(),
+            "category": rng.choice(["Entertainment", "Productivity"]) if i % 2 else None,
+            "billing_cycle": "monthly",
+        }
+        for i in range(count)
+    ]
+
+
+def as_chunks(text: str, size: int = 65536):
+    data = text.encode()
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def as_csv(rows: list[dict]) -> str:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def as_ndjson(rows: list[dict]) -> str:
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+
+def fresh_user(db, rows: list[dict]) -> User:
+    user = User(email=f"bench-{time.time_ns()}@example.com", username=f"bench-{time.time_ns()}", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(Budget(user_id=user.id, monthly_limit=Decimal(str(sum(row["price"] for row in rows) + 1)), current_spent=0))
+    db.commit()
+    return user
+
+
+def run_per_row(rows: list[dict]) -> float:
+    db = SessionLocal()
+    try:
+        user = fresh_user(db, rows)
+        start = time.perf_counter()
+        for row in rows:
+            subscription_service.create_subscription(db, user, SubscriptionCreate(**row))
+        return time.perf_counter() - start
+    finally:
+        db.close()
+
+
+def run_import(rows: list[dict], fmt: str) -> float:
+    db = SessionLocal()
+    try:
+        user = fresh_user(db, rows)
+        body = as_csv(rows) if fmt == "csv" else as_ndjson(rows)
+        start = time.perf_counter()
+        report = import_subscriptions(db, user.id, iter_records(iter_lines(as_chunks(body)), fmt))
+        elapsed = time.perf_counter() - start
+        assert report["imported"] == len(rows), report
+        return elapsed
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    if args.database_url.startswith("sqlite"):
+        engine = create_engine(args.database_url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    SessionLocal.configure(bind=engine)
+
+    subscription_service.schedule_categorization = lambda sub_id: None
+    subscription_import.schedule_categorization_batch = lambda sub_ids: None
+
+    rows = synthetic_rows(args.rows)
+    results = {
+        "per-row create": run_per_row(rows),
+        "import (csv)": run_import(rows, "csv"),
+        "import (ndjson)": run_import(rows, "ndjson"),
+    }
+    baseline = results["per-row create"]
+    for label, elapsed in results.items():
+        print(f"{label:16s}: {elapsed:7.2f} s  {len(rows) / elapsed:9.0f} rows/s  ({baseline / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/suggest_latency.py
+"""
+Per-keystroke latency of /subscriptions/suggest lookups: the top-k trie
+(PrefixIndex) vs a sorted array where bisect finds the prefix range and
+the matches are then ranked by weight.
+
+The index holds the categorizer keywords plus --names synthetic popular
+names with Zipf-like weights. Each "keystroke" looks up one prefix of a
+name being typed, so the short prefixes that match thousands of names are
+sampled as often as they are typed.
+
+    python -m benchmarks.suggest_latency --names 5000
+"""
+import argparse
+import bisect
+import heapq
+import random
+import statistics
+import time
+
+from app.core.prefix_index import PrefixIndex, normalize
+from app.services.categorizer import CATEGORY_KEYWORDS
+
+PLANS = ["", " Premium", " Family", " Pro", " Basic", " Student", " Annual", " Team"]
+
+
+def synthetic_terms(count: int, seed: int = 7) -> list[tuple[str, str, float]]:
+    rng = random.Random(seed)
+    keywords = [(keyword, category) for category, words in CATEGORY_KEYWORDS.items() for keyword in words]
+    terms = [(keyword.title(), category, 0) for keyword, category in keywords]
+    for i in range(count):
+        keyword, category = rng.choice(keywords)
+        terms.append((f"{keyword.title()}{rng.choice(PLANS)} {i}", category, 1000 / (i + 1)))
+    return terms
+
+
+class SortedArrayIndex:
+    def __init__(self, terms: list[tuple[str, str, float]]):
+        rows = sorted((normalize(label), label, category, weight) for label, category, weight in terms)
+        self.keys = [row[0] for row in rows]
+        self.rows = rows
+
+    def lookup(self, prefix: str, limit: int) -> list[tuple[str, str]]:
+        key = normalize(prefix)
+        lo = bisect.bisect_left(self.keys, key)
+        hi = bisect.bisect_left(self.keys, key + "\uffff")
+        best = heapq.nsmallest(limit, self.rows[lo:hi], key=lambda row: (-row[3], len(row[0]), row[0]))
+        return [(label, category) for _, label, category, _ in best]
+
+
+def keystrokes(terms: list, count: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    prefixes = []
+    while len(prefixes) < count:
+        label = rng.choice(terms)[0]
+        prefixes.extend(label[:n] for n in range(1, len(label) + 1))
+    return prefixes[:count]
+
+
+def measure(lookup, prefixes: list[str], limit: int) -> list[float]:
+    times = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        lookup(prefix, limit)
+        times.append((time.perf_counter() - start) * 1e6)
+    return sorted(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=5000)
+    parser.add_argument("--keystrokes", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    terms = synthetic_terms(args.names)
+    prefixes = keystrokes(terms, args.keystrokes)
+
+    start = time.perf_counter()
+    trie = PrefixIndex(terms, top_k=args.limit)
+    print(f"Trie built from {len(trie)} terms in {(time.perf_counter() - start) * 1000:.1f} ms")
+    array = SortedArrayIndex(terms)
+
+    for prefix in prefixes[:2000]:
+        assert trie.lookup(prefix, args.limit) == array.lookup(prefix, args.limit), prefix
+
+    for label, lookup in (("top-k trie", trie.lookup), ("sorted array", array.lookup)):
+        times = measure(lookup, prefixes, args.limit)
+        print(
+            f"{label:12s}: p50 {statistics.median(times):7.1f} µs  "
+            f"p99 {times[int(len(times) * 0.99)]:8.1f} µs  max {times[-1]:8.1f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()